@@ -0,0 +1,100 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+import click
+import frappe
+from frappe.commands import pass_context
+
+
+@click.command("rebuild-monthwise-summary")
+@click.option("--year", type=int, help="Only rebuild this calendar year")
+@pass_context
+def rebuild_monthwise_summary(context, year=None):
+	"""Rebuild Monthwise Party Summary from submitted Sales and Purchase Invoices"""
+	from vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary import (
+		rebuild_summary,
+	)
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			rebuild_summary(year)
+			frappe.db.commit()
+		finally:
+			frappe.destroy()
+
+
+@click.command("rebuild-daily-sales-cube")
+@click.option("--from-date", help="Only rebuild rows dated on or after this date (YYYY-MM-DD)")
+@click.option("--to-date", help="Only rebuild rows dated on or before this date (YYYY-MM-DD)")
+@pass_context
+def rebuild_daily_sales_cube(context, from_date=None, to_date=None):
+	"""Backfill Daily Sales Cube from submitted Sales / Purchase Invoices and Orders"""
+	from vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube import rebuild_cube
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			rebuild_cube(from_date, to_date)
+			frappe.db.commit()
+		finally:
+			frappe.destroy()
+
+
+@click.command("explain-report-queries")
+@click.option("--company", help="Company used for the sample report filters")
+@pass_context
+def explain_report_queries(context, company=None):
+	"""Print EXPLAIN plans for the queries each vciplreports report runs"""
+	from vciplreports.utils.query_advisor import explain_report_queries
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			explain_report_queries(company)
+		finally:
+			frappe.destroy()
+
+
+@click.command("benchmark-reports")
+@click.option("--company", required=True, help="Company the synthetic data is created in")
+@click.option("--scale", default="10k", help="Sales Invoice lines to generate: 10k, 100k, 1m or a number")
+@click.option("--generate", is_flag=True, help="Generate the synthetic dataset before running")
+@click.option("--cleanup", is_flag=True, help="Delete the synthetic dataset afterwards")
+@click.option("--baseline", help="Write the results to this JSON file")
+@click.option("--compare", help="Compare the results with this JSON baseline")
+@click.option(
+	"--tolerance", default=0.2, type=float, help="Allowed growth before a metric counts as a regression"
+)
+@pass_context
+def benchmark_reports(
+	context, company, scale="10k", generate=False, cleanup=False, baseline=None, compare=None, tolerance=0.2
+):
+	"""Benchmark every vciplreports report against synthetic data"""
+	from vciplreports.utils import benchmark
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			if generate:
+				benchmark.generate_dataset(company, scale)
+
+			results = benchmark.run_benchmarks(company)
+
+			if compare:
+				benchmark.compare_with_baseline(results, compare, tolerance)
+			if baseline:
+				benchmark.write_baseline(results, baseline, scale)
+
+			if cleanup:
+				benchmark.delete_dataset()
+				frappe.db.commit()
+		finally:
+			frappe.destroy()
+
+
+commands = [rebuild_monthwise_summary, rebuild_daily_sales_cube, explain_report_queries, benchmark_reports]
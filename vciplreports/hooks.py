@@ -83,7 +83,8 @@ app_license = "mit"
 # ------------
 
 # before_install = "vciplreports.install.before_install"
-# after_install = "vciplreports.install.after_install"
+after_install = "vciplreports.install.after_install"
+after_migrate = "vciplreports.install.after_migrate"
 
 # Uninstallation
 # ------------
@@ -145,6 +146,125 @@ app_license = "mit"
 # 	}
 # }
 
+doc_events = {
+	"Customer Group": {
+		"on_update": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"on_trash": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"after_rename": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+	},
+	"Item Group": {
+		"on_update": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"on_trash": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"after_rename": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+	},
+	"Supplier Group": {
+		"on_update": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"on_trash": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"after_rename": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+	},
+	"Territory": {
+		"on_update": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"on_trash": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"after_rename": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+	},
+	"Supplier": {
+		"on_update": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"on_trash": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+		"after_rename": "vciplreports.utils.tree_cache.clear_tree_snapshot",
+	},
+	"Sales Person": {
+		"on_update": [
+			"vciplreports.utils.tree_cache.clear_tree_snapshot",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+		"on_trash": [
+			"vciplreports.utils.tree_cache.clear_tree_snapshot",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+		"after_rename": [
+			"vciplreports.utils.tree_cache.clear_tree_snapshot",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+	},
+	"Customer": {
+		"on_update": [
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_customer_dimensions",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+		"on_trash": "vciplreports.utils.report_cache.invalidate_report_cache",
+	},
+	"Item": {
+		"on_update": "vciplreports.utils.report_cache.invalidate_report_cache",
+		"on_trash": "vciplreports.utils.report_cache.invalidate_report_cache",
+	},
+	"Sales Invoice": {
+		"on_submit": [
+			"vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary.update_summary",
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+		"on_cancel": [
+			"vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary.update_summary",
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+	},
+	"Purchase Invoice": {
+		"on_submit": [
+			"vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary.update_summary",
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+		"on_cancel": [
+			"vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary.update_summary",
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+	},
+	"Sales Order": {
+		"on_submit": [
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+		"on_cancel": [
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+	},
+	"Purchase Order": {
+		"on_submit": [
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+		"on_cancel": [
+			"vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.invalidate_prepared_reports",
+			"vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube.update_cube",
+			"vciplreports.utils.report_cache.invalidate_report_cache",
+		],
+	},
+	"Payment Entry": {
+		"on_submit": "vciplreports.utils.report_cache.invalidate_report_cache",
+		"on_cancel": "vciplreports.utils.report_cache.invalidate_report_cache",
+	},
+	"Stock Ledger Entry": {
+		"on_submit": "vciplreports.utils.report_cache.invalidate_report_cache",
+		"on_cancel": "vciplreports.utils.report_cache.invalidate_report_cache",
+	},
+	"Bin": {
+		"on_update": "vciplreports.utils.report_cache.invalidate_report_cache",
+	},
+	"Period Closing Voucher": {
+		"on_submit": "vciplreports.utils.report_cache.enqueue_prewarm",
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -166,6 +286,18 @@ app_license = "mit"
 # 	],
 # }
 
+scheduler_events = {
+	"cron": {
+		# off-peak, before the morning report load
+		"30 2 * * *": [
+			"vciplreports.utils.report_cache.prewarm_report_cache",
+		],
+	},
+	"hourly_long": [
+		"vciplreports.vciplreports.page.report_dashboard.report_dashboard.refresh_dashboard_kpis",
+	],
+}
+
 # Testing
 # -------
 
@@ -242,3 +374,6 @@ app_license = "mit"
 # 	"Logging DocType Name": 30  # days to retain logs
 # }
 
+default_log_clearing_doctypes = {
+	"Report Profile Log": 30,
+}
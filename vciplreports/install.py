@@ -0,0 +1,12 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+from vciplreports.utils.query_advisor import create_report_indexes
+
+
+def after_install():
+	create_report_indexes()
+
+
+def after_migrate():
+	create_report_indexes()
@@ -0,0 +1,7 @@
+from vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary import (
+	rebuild_summary,
+)
+
+
+def execute():
+	rebuild_summary()
@@ -0,0 +1,868 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+"""
+Report benchmarks on synthetic data (`bench --site <site> benchmark-reports`).
+
+`generate_dataset` bulk-inserts tagged masters and submitted transactions
+(customer / supplier / item / territory / warehouse trees, a Sales Person
+ASM / RSM tree, projects, Sales Invoices with items, payment schedules and
+payments, Purchase Invoices, Sales Orders and Bins) at a given number of
+Sales Invoice lines. `run_benchmarks` then runs every report
+scenario and records wall time, query count, query time, peak allocated
+memory and rows returned; results are written to / compared against a JSON
+baseline. `delete_dataset` removes everything carrying the tag again.
+"""
+
+import json
+import random
+import time
+import tracemalloc
+from inspect import unwrap
+
+import frappe
+from erpnext.accounts.utils import get_fiscal_year
+from frappe.utils import add_days, flt, getdate, now, today
+from frappe.utils.nestedset import rebuild_tree
+
+# every generated name contains the tag so the dataset can be removed again
+BENCH_TAG = "VBENCH"
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+LINES_PER_INVOICE = 5
+INVOICES_PER_BATCH = 5_000
+PAID_RATIO = 0.6
+PROJECT_RATIO = 0.3
+ORDER_TYPES = ["Sales", "Maintenance"]
+
+TREE_DOCTYPES = ["Customer Group", "Item Group", "Supplier Group", "Territory", "Sales Person", "Warehouse"]
+
+# doctype -> column holding the tag (child tables are matched on their parent)
+DATASET_TABLES = [
+	("Payment Entry Reference", "parent"),
+	("Payment Entry", "name"),
+	("Payment Schedule", "parent"),
+	("Sales Invoice Item", "parent"),
+	("Sales Invoice", "name"),
+	("Sales Team", "parent"),
+	("Purchase Invoice Item", "parent"),
+	("Purchase Invoice", "name"),
+	("Sales Order Item", "parent"),
+	("Sales Order", "name"),
+	("Bin", "item_code"),
+	("Customer", "name"),
+	("Supplier", "name"),
+	("Item", "name"),
+	("Project", "name"),
+	("Customer Group", "name"),
+	("Item Group", "name"),
+	("Supplier Group", "name"),
+	("Territory", "name"),
+	("Sales Person", "name"),
+	("Warehouse", "name"),
+]
+
+# Sales Analytic Report tree type -> document type it is benchmarked on
+ANALYTICS_TREE_TYPES = {
+	"Customer": "Sales Invoice",
+	"Customer Group": "Sales Invoice",
+	"Territory": "Sales Invoice",
+	"Item": "Sales Invoice",
+	"Item Group": "Sales Invoice",
+	"Project": "Sales Invoice",
+	"Supplier": "Purchase Invoice",
+	"Supplier Group": "Purchase Invoice",
+	"Order Type": "Sales Order",
+}
+ANALYTICS_RANGES = ["Weekly", "Monthly", "Quarterly", "Yearly"]
+
+
+# -------------------- DATASET -------------------- #
+def get_dataset_size(lines):
+	return frappe._dict(
+		lines=lines,
+		invoices=max(1, lines // LINES_PER_INVOICE),
+		purchase_invoices=max(1, lines // (4 * LINES_PER_INVOICE)),
+		sales_orders=max(1, lines // (4 * LINES_PER_INVOICE)),
+		customers=max(50, lines // 200),
+		suppliers=max(20, lines // 1000),
+		items=max(50, lines // 500),
+		projects=10,
+		customer_groups=10,
+		sub_groups=3,
+		item_groups=10,
+		supplier_groups=5,
+		territories=8,
+		regions=4,
+		areas_per_region=4,
+		executives_per_area=3,
+		warehouses=5,
+	)
+
+
+def generate_dataset(company, scale="10k", seed=42):
+	"""Insert a synthetic dataset with `scale` Sales Invoice lines into `company`."""
+	size = get_dataset_size(SCALES.get(scale) or int(scale))
+	rng = random.Random(seed)
+	stamp = {"creation": now(), "modified": now(), "owner": "Administrator", "modified_by": "Administrator"}
+	abbr = frappe.get_cached_value("Company", company, "abbr")
+
+	trees = insert_trees(size, company, abbr, stamp)
+	customers = insert_customers(size, trees, rng, stamp)
+	suppliers = insert_suppliers(size, trees, rng, stamp)
+	items = insert_items(size, trees, rng, stamp)
+	projects = insert_projects(size, company, stamp)
+	insert_bins(items, trees.warehouses, rng, stamp)
+	insert_invoices(company, size, customers, items, projects, trees.warehouses, rng, stamp)
+	insert_purchase_invoices(company, size, suppliers, items, trees.warehouses, rng, stamp)
+	insert_sales_orders(company, size, customers, items, trees.warehouses, rng, stamp)
+
+	for doctype in TREE_DOCTYPES:
+		rebuild_tree(doctype)
+
+	refresh_derived_data()
+	return size
+
+
+def insert_trees(size, company, abbr, stamp):
+	trees = frappe._dict()
+
+	def insert_tree(doctype, parent_field, root_parent, names, **extra):
+		root = f"{BENCH_TAG} {doctype}"
+		rows = [(root, root, 1, root_parent)]
+		rows += [(name, name, 0, parent) for name, parent in names(root)]
+		frappe.db.bulk_insert(
+			doctype,
+			["name", scrub_name_field(doctype), "is_group", parent_field, *extra, *stamp],
+			[(*row, *extra.values(), *stamp.values()) for row in rows],
+			ignore_duplicates=True,
+		)
+		return [row[0] for row in rows[1:]]
+
+	trees.customer_groups = insert_tree(
+		"Customer Group",
+		"parent_customer_group",
+		"All Customer Groups",
+		lambda root: [(f"{BENCH_TAG}-CG-{i:03d}", root) for i in range(size.customer_groups)],
+	)
+	trees.item_groups = insert_tree(
+		"Item Group",
+		"parent_item_group",
+		"All Item Groups",
+		lambda root: [(f"{BENCH_TAG}-IG-{i:03d}", root) for i in range(size.item_groups)],
+	)
+	trees.supplier_groups = insert_tree(
+		"Supplier Group",
+		"parent_supplier_group",
+		"All Supplier Groups",
+		lambda root: [(f"{BENCH_TAG}-SG-{i:03d}", root) for i in range(size.supplier_groups)],
+	)
+	trees.territories = insert_tree(
+		"Territory",
+		"parent_territory",
+		"All Territories",
+		lambda root: [(f"{BENCH_TAG}-TER-{i:03d}", root) for i in range(size.territories)],
+	)
+	trees.warehouses = insert_tree(
+		"Warehouse",
+		"parent_warehouse",
+		f"All Warehouses - {abbr}",
+		lambda root: [(f"{BENCH_TAG}-WH-{i:02d} - {abbr}", root) for i in range(size.warehouses)],
+		company=company,
+	)
+
+	# RSM groups > ASM groups > executives, as the Distributor Report expects
+	sales_persons = []
+	for r in range(size.regions):
+		rsm = f"RSM {BENCH_TAG} {r}"
+		sales_persons.append((rsm, rsm, 1, "Sales Team"))
+		sales_persons.append((f"{BENCH_TAG}-RSM-{r}", f"{BENCH_TAG}-RSM-{r}", 0, rsm))
+		for a in range(size.areas_per_region):
+			asm = f"ASM {BENCH_TAG} {r}-{a}"
+			sales_persons.append((asm, asm, 1, rsm))
+			sales_persons.append((f"{BENCH_TAG}-ASM-{r}-{a}", f"{BENCH_TAG}-ASM-{r}-{a}", 0, asm))
+			for e in range(size.executives_per_area):
+				name = f"{BENCH_TAG}-SE-{r}-{a}-{e}"
+				sales_persons.append((name, name, 0, asm))
+
+	frappe.db.bulk_insert(
+		"Sales Person",
+		["name", "sales_person_name", "is_group", "parent_sales_person", *stamp],
+		[(*row, *stamp.values()) for row in sales_persons],
+		ignore_duplicates=True,
+	)
+	trees.executives = [row[0] for row in sales_persons if row[0].startswith(f"{BENCH_TAG}-SE-")]
+
+	return trees
+
+
+def scrub_name_field(doctype):
+	return {"Warehouse": "warehouse_name"}.get(doctype, frappe.scrub(doctype) + "_name")
+
+
+def insert_customers(size, trees, rng, stamp):
+	has_sub_group = frappe.get_meta("Customer").has_field("custom_sub_group")
+	sub_groups = [f"Sub Group {i}" for i in range(size.sub_groups)]
+
+	customers = []
+	customer_rows = []
+	sales_team_rows = []
+	for i in range(size.customers):
+		customer = frappe._dict(
+			name=f"{BENCH_TAG}-CUST-{i:06d}",
+			customer_group=rng.choice(trees.customer_groups),
+			territory=rng.choice(trees.territories),
+		)
+		customers.append(customer)
+
+		row = [customer.name, customer.name, customer.customer_group, customer.territory]
+		if has_sub_group:
+			row.append(rng.choice([*sub_groups, None]))
+		customer_rows.append((*row, *stamp.values()))
+
+		sales_team_rows.append(
+			(
+				f"{customer.name}-ST",
+				customer.name,
+				"Customer",
+				"sales_team",
+				1,
+				rng.choice(trees.executives),
+				100,
+				*stamp.values(),
+			)
+		)
+
+	fields = ["name", "customer_name", "customer_group", "territory"]
+	if has_sub_group:
+		fields.append("custom_sub_group")
+
+	frappe.db.bulk_insert("Customer", [*fields, *stamp], customer_rows, ignore_duplicates=True)
+	frappe.db.bulk_insert(
+		"Sales Team",
+		[
+			"name",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"sales_person",
+			"allocated_percentage",
+			*stamp,
+		],
+		sales_team_rows,
+		ignore_duplicates=True,
+	)
+	return customers
+
+
+def insert_suppliers(size, trees, rng, stamp):
+	suppliers = [f"{BENCH_TAG}-SUPP-{i:05d}" for i in range(size.suppliers)]
+	frappe.db.bulk_insert(
+		"Supplier",
+		["name", "supplier_name", "supplier_group", *stamp],
+		[(name, name, rng.choice(trees.supplier_groups), *stamp.values()) for name in suppliers],
+		ignore_duplicates=True,
+	)
+	return suppliers
+
+
+def insert_items(size, trees, rng, stamp):
+	items = []
+	rows = []
+	for i in range(size.items):
+		item = frappe._dict(
+			name=f"{BENCH_TAG}-ITEM-{i:05d}",
+			item_group=rng.choice(trees.item_groups),
+			rate=rng.randint(10, 5000),
+		)
+		items.append(item)
+		rows.append(
+			(item.name, item.name, item.name, item.item_group, "Nos", 1, rng.randint(0, 200), *stamp.values())
+		)
+
+	frappe.db.bulk_insert(
+		"Item",
+		[
+			"name",
+			"item_code",
+			"item_name",
+			"item_group",
+			"stock_uom",
+			"is_stock_item",
+			"safety_stock",
+			*stamp,
+		],
+		rows,
+		ignore_duplicates=True,
+	)
+	return items
+
+
+def insert_projects(size, company, stamp):
+	projects = [f"{BENCH_TAG}-PROJ-{i:03d}" for i in range(size.projects)]
+	frappe.db.bulk_insert(
+		"Project",
+		["name", "project_name", "company", "status", *stamp],
+		[(name, name, company, "Open", *stamp.values()) for name in projects],
+		ignore_duplicates=True,
+	)
+	return projects
+
+
+def insert_bins(items, warehouses, rng, stamp):
+	rows = []
+	for item in items:
+		for warehouse in warehouses:
+			actual_qty = rng.randint(0, 300)
+			ordered_qty = rng.randint(0, 50)
+			rows.append(
+				(
+					f"{item.name}-{warehouse}",
+					item.name,
+					warehouse,
+					actual_qty,
+					ordered_qty,
+					0,
+					0,
+					actual_qty + ordered_qty,
+					*stamp.values(),
+				)
+			)
+
+	frappe.db.bulk_insert(
+		"Bin",
+		[
+			"name",
+			"item_code",
+			"warehouse",
+			"actual_qty",
+			"ordered_qty",
+			"planned_qty",
+			"reserved_qty",
+			"projected_qty",
+			*stamp,
+		],
+		rows,
+		ignore_duplicates=True,
+	)
+
+
+ITEM_FIELDS = [
+	"name",
+	"parent",
+	"parenttype",
+	"parentfield",
+	"idx",
+	"docstatus",
+	"item_code",
+	"item_name",
+	"item_group",
+	"warehouse",
+	"uom",
+	"stock_uom",
+	"conversion_factor",
+	"qty",
+	"stock_qty",
+	"rate",
+	"amount",
+	"net_amount",
+	"base_net_amount",
+]
+
+
+def get_date_range(company):
+	"""First day of the current fiscal year and the number of days up to today."""
+	fiscal_year = get_fiscal_year(today(), company=company)
+	return getdate(fiscal_year[1]), (getdate(today()) - getdate(fiscal_year[1])).days + 1
+
+
+def make_lines(name, parenttype, items, warehouses, rng, stamp):
+	"""`LINES_PER_INVOICE` item rows of one document, with its total amount and qty."""
+	lines = []
+	total = total_qty = 0
+	for idx in range(1, LINES_PER_INVOICE + 1):
+		item = rng.choice(items)
+		qty = rng.randint(1, 20)
+		amount = flt(qty * item.rate)
+		total += amount
+		total_qty += qty
+		lines.append(
+			(
+				f"{name}-{idx}",
+				name,
+				parenttype,
+				"items",
+				idx,
+				1,
+				item.name,
+				item.name,
+				item.item_group,
+				rng.choice(warehouses),
+				"Nos",
+				"Nos",
+				1,
+				qty,
+				qty,
+				item.rate,
+				amount,
+				amount,
+				amount,
+				*stamp.values(),
+			)
+		)
+
+	return lines, total, total_qty
+
+
+def insert_invoices(company, size, customers, items, projects, warehouses, rng, stamp):
+	from_date, days = get_date_range(company)
+
+	invoice_fields = [
+		"name",
+		"company",
+		"customer",
+		"customer_name",
+		"customer_group",
+		"territory",
+		"posting_date",
+		"due_date",
+		"docstatus",
+		"is_opening",
+		"net_total",
+		"base_net_total",
+		"grand_total",
+		"base_grand_total",
+		"outstanding_amount",
+		"total_qty",
+		"project",
+		*stamp,
+	]
+	item_fields = [*ITEM_FIELDS, *stamp]
+	schedule_fields = [
+		"name",
+		"parent",
+		"parenttype",
+		"parentfield",
+		"idx",
+		"docstatus",
+		"due_date",
+		"payment_amount",
+		*stamp,
+	]
+	payment_fields = [
+		"name",
+		"company",
+		"payment_type",
+		"party_type",
+		"party",
+		"posting_date",
+		"docstatus",
+		"paid_amount",
+		"received_amount",
+		*stamp,
+	]
+	reference_fields = [
+		"name",
+		"parent",
+		"parenttype",
+		"parentfield",
+		"idx",
+		"docstatus",
+		"reference_doctype",
+		"reference_name",
+		"allocated_amount",
+		*stamp,
+	]
+
+	for batch_start in range(0, size.invoices, INVOICES_PER_BATCH):
+		invoices, lines, schedules, payments, references = [], [], [], [], []
+
+		for n in range(batch_start, min(batch_start + INVOICES_PER_BATCH, size.invoices)):
+			name = f"{BENCH_TAG}-SINV-{n:07d}"
+			customer = rng.choice(customers)
+			posting_date = add_days(from_date, rng.randrange(days))
+			due_date = add_days(posting_date, rng.choice([15, 30, 45, 60]))
+
+			invoice_lines, total, total_qty = make_lines(name, "Sales Invoice", items, warehouses, rng, stamp)
+			lines += invoice_lines
+
+			paid = rng.random() < PAID_RATIO
+			invoices.append(
+				(
+					name,
+					company,
+					customer.name,
+					customer.name,
+					customer.customer_group,
+					customer.territory,
+					posting_date,
+					due_date,
+					1,
+					"No",
+					total,
+					total,
+					total,
+					total,
+					0 if paid else total,
+					total_qty,
+					rng.choice(projects) if rng.random() < PROJECT_RATIO else None,
+					*stamp.values(),
+				)
+			)
+			schedules.append(
+				(
+					f"{name}-PS",
+					name,
+					"Sales Invoice",
+					"payment_schedule",
+					1,
+					1,
+					due_date,
+					total,
+					*stamp.values(),
+				)
+			)
+
+			if paid:
+				payment = f"{BENCH_TAG}-PE-{n:07d}"
+				payment_date = add_days(posting_date, rng.randint(0, 90))
+				payments.append(
+					(
+						payment,
+						company,
+						"Receive",
+						"Customer",
+						customer.name,
+						payment_date,
+						1,
+						total,
+						total,
+						*stamp.values(),
+					)
+				)
+				references.append(
+					(
+						f"{payment}-1",
+						payment,
+						"Payment Entry",
+						"references",
+						1,
+						1,
+						"Sales Invoice",
+						name,
+						total,
+						*stamp.values(),
+					)
+				)
+
+		frappe.db.bulk_insert("Sales Invoice", invoice_fields, invoices, ignore_duplicates=True)
+		frappe.db.bulk_insert("Sales Invoice Item", item_fields, lines, ignore_duplicates=True)
+		frappe.db.bulk_insert("Payment Schedule", schedule_fields, schedules, ignore_duplicates=True)
+		frappe.db.bulk_insert("Payment Entry", payment_fields, payments, ignore_duplicates=True)
+		frappe.db.bulk_insert("Payment Entry Reference", reference_fields, references, ignore_duplicates=True)
+		frappe.db.commit()
+
+
+def insert_purchase_invoices(company, size, suppliers, items, warehouses, rng, stamp):
+	from_date, days = get_date_range(company)
+
+	invoice_fields = [
+		"name",
+		"company",
+		"supplier",
+		"supplier_name",
+		"posting_date",
+		"due_date",
+		"docstatus",
+		"is_opening",
+		"net_total",
+		"base_net_total",
+		"grand_total",
+		"base_grand_total",
+		"outstanding_amount",
+		"total_qty",
+		*stamp,
+	]
+
+	for batch_start in range(0, size.purchase_invoices, INVOICES_PER_BATCH):
+		invoices, lines = [], []
+
+		for n in range(batch_start, min(batch_start + INVOICES_PER_BATCH, size.purchase_invoices)):
+			name = f"{BENCH_TAG}-PINV-{n:07d}"
+			supplier = rng.choice(suppliers)
+			posting_date = add_days(from_date, rng.randrange(days))
+
+			invoice_lines, total, total_qty = make_lines(
+				name, "Purchase Invoice", items, warehouses, rng, stamp
+			)
+			lines += invoice_lines
+			invoices.append(
+				(
+					name,
+					company,
+					supplier,
+					supplier,
+					posting_date,
+					add_days(posting_date, 30),
+					1,
+					"No",
+					total,
+					total,
+					total,
+					total,
+					total,
+					total_qty,
+					*stamp.values(),
+				)
+			)
+
+		frappe.db.bulk_insert("Purchase Invoice", invoice_fields, invoices, ignore_duplicates=True)
+		frappe.db.bulk_insert("Purchase Invoice Item", [*ITEM_FIELDS, *stamp], lines, ignore_duplicates=True)
+		frappe.db.commit()
+
+
+def insert_sales_orders(company, size, customers, items, warehouses, rng, stamp):
+	from_date, days = get_date_range(company)
+
+	order_fields = [
+		"name",
+		"company",
+		"customer",
+		"customer_name",
+		"customer_group",
+		"territory",
+		"order_type",
+		"transaction_date",
+		"delivery_date",
+		"docstatus",
+		"net_total",
+		"base_net_total",
+		"grand_total",
+		"base_grand_total",
+		"total_qty",
+		*stamp,
+	]
+
+	for batch_start in range(0, size.sales_orders, INVOICES_PER_BATCH):
+		orders, lines = [], []
+
+		for n in range(batch_start, min(batch_start + INVOICES_PER_BATCH, size.sales_orders)):
+			name = f"{BENCH_TAG}-SO-{n:07d}"
+			customer = rng.choice(customers)
+			transaction_date = add_days(from_date, rng.randrange(days))
+
+			order_lines, total, total_qty = make_lines(name, "Sales Order", items, warehouses, rng, stamp)
+			lines += order_lines
+			orders.append(
+				(
+					name,
+					company,
+					customer.name,
+					customer.name,
+					customer.customer_group,
+					customer.territory,
+					rng.choice(ORDER_TYPES),
+					transaction_date,
+					add_days(transaction_date, 15),
+					1,
+					total,
+					total,
+					total,
+					total,
+					total_qty,
+					*stamp.values(),
+				)
+			)
+
+		frappe.db.bulk_insert("Sales Order", order_fields, orders, ignore_duplicates=True)
+		frappe.db.bulk_insert("Sales Order Item", [*ITEM_FIELDS, *stamp], lines, ignore_duplicates=True)
+		frappe.db.commit()
+
+
+def refresh_derived_data():
+	"""Summary tables and caches the reports read instead of the raw documents."""
+	from vciplreports.utils.report_cache import REPORT_DEPENDENCIES, clear_report_cache
+	from vciplreports.utils.tree_cache import TREE_SNAPSHOT_CACHE_KEY
+	from vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube import rebuild_cube
+	from vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary import (
+		rebuild_summary,
+	)
+
+	rebuild_summary()
+	rebuild_cube()
+	frappe.cache.delete_value(TREE_SNAPSHOT_CACHE_KEY)
+	for report_name in REPORT_DEPENDENCIES:
+		clear_report_cache(report_name)
+	frappe.db.commit()
+
+
+def delete_dataset():
+	"""Remove every generated record."""
+	for doctype, column in DATASET_TABLES:
+		frappe.db.sql(f"delete from `tab{doctype}` where `{column}` like %s", (f"%{BENCH_TAG}%",))
+
+	for doctype in TREE_DOCTYPES:
+		rebuild_tree(doctype)
+
+	refresh_derived_data()
+
+
+# -------------------- SCENARIOS -------------------- #
+def get_scenarios(company):
+	"""
+	(label, callable) pairs. `execute` is fully unwrapped (profiler and result
+	cache), so every run measures the report itself and records no usage.
+	"""
+	from vciplreports.vciplreports.report.category_wise_sales import category_wise_sales
+	from vciplreports.vciplreports.report.distributor_report import distributor_report
+	from vciplreports.vciplreports.report.monthwise_purchase import monthwise_purchase
+	from vciplreports.vciplreports.report.monthwise_sales import monthwise_sales
+	from vciplreports.vciplreports.report.sales_analytic_report import sales_analytic_report
+	from vciplreports.vciplreports.report.top_selling_below_msl_report import (
+		top_selling_below_msl_report,
+	)
+
+	fiscal_year = get_fiscal_year(today(), company=company)
+	year = getdate(today()).year
+
+	scenarios = []
+	for tree_type, doc_type in ANALYTICS_TREE_TYPES.items():
+		for period_range in ANALYTICS_RANGES:
+			filters = {
+				"tree_type": tree_type,
+				"doc_type": doc_type,
+				"value_quantity": "Value",
+				"range": period_range,
+				"company": company,
+				"from_date": fiscal_year[1],
+				"to_date": fiscal_year[2],
+			}
+			scenarios.append(
+				(
+					f"Sales Analytic Report / {tree_type} / {period_range}",
+					lambda filters=filters: unwrap(sales_analytic_report.execute)(filters),
+				)
+			)
+
+	# streamed fetch of the widest result sets, to compare peak memory with buffered
+	for tree_type in ["Customer", "Item"]:
+		filters = {
+			"tree_type": tree_type,
+			"doc_type": "Sales Invoice",
+			"value_quantity": "Value",
+			"range": "Weekly",
+			"company": company,
+			"from_date": fiscal_year[1],
+			"to_date": fiscal_year[2],
+			"stream_fetch": 1,
+		}
+		scenarios.append(
+			(
+				f"Sales Analytic Report / {tree_type} / Weekly / streamed",
+				lambda filters=filters: unwrap(sales_analytic_report.execute)(filters),
+			)
+		)
+
+	for period_range in ["Monthly", "Quarterly", "Yearly"]:
+		filters = {
+			"company": company,
+			"from_date": fiscal_year[1],
+			"to_date": fiscal_year[2],
+			"range": period_range,
+		}
+		scenarios.append(
+			(
+				f"Category wise sales / {period_range}",
+				lambda filters=filters: unwrap(category_wise_sales.execute)(filters),
+			)
+		)
+
+	scenarios += [
+		("Distributor Report", lambda: unwrap(distributor_report.execute)({"company": company})),
+		("Monthwise Sales", lambda: unwrap(monthwise_sales.execute)({"company": company, "year": year})),
+		(
+			"Monthwise Purchase",
+			lambda: unwrap(monthwise_purchase.execute)({"company": company, "year": year}),
+		),
+		(
+			"Top selling below MSL report",
+			lambda: unwrap(top_selling_below_msl_report.execute)({"year": fiscal_year[1].year}),
+		),
+	]
+	return scenarios
+
+
+def measure(fn):
+	"""Run `fn` once; wall time, query count / time, peak allocated memory and rows."""
+	db = frappe.db
+	original_sql = db.sql
+	stats = frappe._dict(query_count=0, query_time=0.0)
+
+	def counting_sql(*args, **kwargs):
+		start = time.perf_counter()
+		try:
+			return original_sql(*args, **kwargs)
+		finally:
+			stats.query_count += 1
+			stats.query_time += time.perf_counter() - start
+
+	db.sql = counting_sql
+	tracemalloc.start()
+	start = time.perf_counter()
+	try:
+		result = fn()
+	finally:
+		stats.wall_time = time.perf_counter() - start
+		stats.peak_memory = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+		db.sql = original_sql
+
+	data = result[1] if isinstance(result, tuple | list) and len(result) > 1 else result
+	stats.rows = len(data or [])
+	stats.query_time = round(stats.query_time, 4)
+	stats.wall_time = round(stats.wall_time, 4)
+	return stats
+
+
+def run_benchmarks(company):
+	results = {}
+	for label, fn in get_scenarios(company):
+		results[label] = measure(fn)
+		stats = results[label]
+		print(
+			f"{label:<60} {stats.wall_time:>9.3f}s {stats.query_count:>6} queries "
+			f"{stats.query_time:>9.3f}s sql {stats.peak_memory / 1024 / 1024:>8.1f} MiB {stats.rows:>8} rows"
+		)
+	return results
+
+
+# -------------------- BASELINE -------------------- #
+def write_baseline(results, path, scale=None):
+	with open(path, "w") as f:
+		json.dump({"scale": scale, "results": results}, f, indent=1, sort_keys=True)
+
+
+def compare_with_baseline(results, path, tolerance=0.2):
+	"""Print scenarios whose wall time, query count or peak memory grew beyond `tolerance`."""
+	with open(path) as f:
+		baseline = json.load(f)["results"]
+
+	regressions = []
+	for label, current in results.items():
+		previous = baseline.get(label)
+		if not previous:
+			continue
+
+		for metric in ("wall_time", "query_count", "peak_memory"):
+			if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+				regressions.append((label, metric, previous[metric], current[metric]))
+
+	for label, metric, previous, current in regressions:
+		print(f"REGRESSION {label}: {metric} {previous} -> {current}")
+
+	if not regressions:
+		print("No regressions against baseline")
+
+	return regressions
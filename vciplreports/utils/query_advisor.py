@@ -0,0 +1,127 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+"""
+Composite indexes backing the report queries, and an EXPLAIN helper
+(`bench --site <site> explain-report-queries`) to confirm they are used.
+"""
+
+from inspect import unwrap
+
+import frappe
+from erpnext.accounts.utils import get_fiscal_year
+from frappe.utils import add_days, getdate, today
+
+# (doctype, columns, index name)
+REPORT_INDEXES = [
+	# Monthwise summary rebuild, Sales Analytic Report (company + date range, per customer)
+	("Sales Invoice", ["docstatus", "company", "posting_date", "customer"], "vcipl_si_company_date_customer"),
+	(
+		"Purchase Invoice",
+		["docstatus", "company", "posting_date", "supplier"],
+		"vcipl_pi_company_date_supplier",
+	),
+	# Distributor Report (customer group + date range)
+	("Sales Invoice", ["customer_group", "docstatus", "posting_date"], "vcipl_si_group_date"),
+	# Top Selling Below MSL: covers the item aggregation without touching row data
+	("Sales Invoice Item", ["parent", "item_code", "qty", "amount"], "vcipl_sii_parent_item_qty_amount"),
+	# Distributor Report payment days
+	("Payment Entry Reference", ["reference_doctype", "reference_name"], "vcipl_per_reference"),
+]
+
+
+def create_report_indexes():
+	for doctype, columns, index_name in REPORT_INDEXES:
+		frappe.db.add_index(doctype, columns, index_name=index_name)
+
+
+def get_explain_targets(company=None):
+	"""
+	(report label, callable) pairs run while capturing their queries. `execute` is
+	unwrapped so the result cache neither answers nor records these runs.
+	"""
+	from vciplreports.vciplreports.report.category_wise_sales import category_wise_sales
+	from vciplreports.vciplreports.report.distributor_report import distributor_report
+	from vciplreports.vciplreports.report.monthwise_purchase import monthwise_purchase
+	from vciplreports.vciplreports.report.monthwise_sales import monthwise_sales
+	from vciplreports.vciplreports.report.sales_analytic_report import sales_analytic_report
+	from vciplreports.vciplreports.report.top_selling_below_msl_report import (
+		top_selling_below_msl_report,
+	)
+
+	company = company or frappe.defaults.get_global_default("company")
+	year = getdate(today()).year
+	fiscal_year = get_fiscal_year(today(), company=company)
+
+	return [
+		("Monthwise Sales", lambda: unwrap(monthwise_sales.execute)({"company": company, "year": year})),
+		(
+			"Monthwise Purchase",
+			lambda: unwrap(monthwise_purchase.execute)({"company": company, "year": year}),
+		),
+		(
+			"Monthwise Sales breakup",
+			lambda: monthwise_sales.get_month_breakup("_explain_", company=company, year=year),
+		),
+		(
+			"Top Selling Below MSL",
+			lambda: unwrap(top_selling_below_msl_report.execute)({"year": fiscal_year[1].year}),
+		),
+		("Distributor Report", lambda: unwrap(distributor_report.execute)({"company": company})),
+		(
+			"Category wise sales",
+			lambda: unwrap(category_wise_sales.execute)(
+				{"company": company, "from_date": fiscal_year[1], "to_date": fiscal_year[2]}
+			),
+		),
+		(
+			"Sales Analytic Report",
+			lambda: unwrap(sales_analytic_report.execute)(
+				{
+					"tree_type": "Customer",
+					"doc_type": "Sales Invoice",
+					"value_quantity": "Value",
+					"range": "Monthly",
+					"company": company,
+					"from_date": fiscal_year[1],
+					"to_date": fiscal_year[2],
+				}
+			),
+		),
+	]
+
+
+def capture_select_queries(fn):
+	"""Run `fn` and return every SELECT it issued, with values interpolated."""
+	captured = []
+	db = frappe.db
+	original_sql = db.sql
+
+	def recording_sql(query, values=(), *args, **kwargs):
+		query = str(query)
+		if query.lstrip().lower().startswith("select"):
+			captured.append(db.mogrify(query, values or None))
+		return original_sql(query, values, *args, **kwargs)
+
+	db.sql = recording_sql
+	try:
+		fn()
+	finally:
+		db.sql = original_sql
+
+	return captured
+
+
+def explain_report_queries(company=None):
+	"""Print the EXPLAIN plan of every query issued by each report."""
+	for label, fn in get_explain_targets(company):
+		print(f"\n=== {label} ===")
+
+		for query in capture_select_queries(fn):
+			print("\n" + " ".join(query.split()))
+			for row in frappe.db.sql(f"EXPLAIN {query}", as_dict=True):
+				print(
+					"  table={table} type={type} key={key} rows={rows} extra={Extra}".format(
+						**{k: row.get(k) for k in ("table", "type", "key", "rows", "Extra")}
+					)
+				)
@@ -0,0 +1,302 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+"""
+Result cache shared by the vciplreports script reports.
+
+`execute` functions are wrapped with `@cached_report(<report name>)`. Results
+are stored in frappe.cache under a key built from the report name, the
+normalised filters and the caller's roles / user permissions, expire after a
+TTL and are capped per report (least recently used entries are evicted).
+
+Entries are dropped by the doc_events in hooks.py whenever a document type
+listed in REPORT_DEPENDENCIES changes. Stock movements (THROTTLED_DEPENDENCIES)
+only mark the report stale; it is cleared on its next run, at most once per
+STALE_CLEAR_INTERVAL, so results may lag stock by up to that long.
+
+Every run also counts its (report, user, filters) combination; a nightly job
+(and every Period Closing Voucher) recomputes the most used ones so the first
+open of the day is served from the cache. Filter values equal to the run date
+are counted as "today", so a report run up to today is warmed for the next
+day. Prepared reports are warmed by queueing a Prepared Report owned by the
+recorded user, which is what their users open.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import time
+
+import frappe
+from frappe.utils import today
+
+REPORT_CACHE_PREFIX = "vciplreports:report_cache"
+DEFAULT_TTL = 6 * 60 * 60
+MAX_ENTRIES_PER_REPORT = 50
+
+# sorted set of json [report, user, filters] scored by how often it was run
+USAGE_KEY = f"{REPORT_CACHE_PREFIX}:usage"
+PREWARM_TOP_N = 20
+# long enough for a nightly result to last through the morning
+PREWARM_TTL = 12 * 60 * 60
+# recorded in place of filter values equal to the date of the run
+TODAY_MARKER = "__today__"
+# usage members of the Prepared Reports queued by the last pre-warm
+PREWARM_PENDING_KEY = f"{REPORT_CACHE_PREFIX}:prewarm_pending"
+
+# posted on every stock movement: clearing on each one would leave the cache
+# (and the pre-warm) cold all day, so these only mark the report stale
+THROTTLED_DEPENDENCIES = ["Bin", "Stock Ledger Entry"]
+STALE_CLEAR_INTERVAL = 60
+
+# report name -> doctypes whose changes make cached results stale
+REPORT_DEPENDENCIES = {
+	"Distributor Report": ["Sales Invoice", "Payment Entry", "Customer", "Sales Person"],
+	"Monthwise Sales": ["Sales Invoice"],
+	"Monthwise Purchase": ["Purchase Invoice"],
+	# Bin quantities are mostly written without doc events, so stock
+	# ledger postings are watched as well
+	"Top selling below MSL report": ["Sales Invoice", "Bin", "Stock Ledger Entry", "Item"],
+	"Sales Analytic Report": [
+		"Sales Invoice",
+		"Purchase Invoice",
+		"Sales Order",
+		"Purchase Order",
+		"Customer",
+	],
+	"Category wise sales": ["Sales Invoice"],
+}
+
+
+def cached_report(report_name, ttl=DEFAULT_TTL):
+	"""Decorator for a report's `execute(filters=None)`."""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters=None):
+			return run_cached(report_name, execute, filters, ttl=ttl)
+
+		return wrapper
+
+	return decorator
+
+
+def run_cached(report_name, execute, filters=None, ttl=DEFAULT_TTL, refresh=False):
+	"""Return the cached result of `execute(filters)`, computing and storing it on a miss."""
+	key = get_cache_key(report_name, filters)
+
+	if not frappe.flags.vciplreports_prewarming:
+		record_usage(report_name, filters)
+
+	if not refresh:
+		clear_if_stale(report_name)
+		result = frappe.cache.get_value(key)
+		if result is not None:
+			touch(report_name, key)
+			return result
+
+	result = execute(frappe._dict(filters or {}))
+
+	frappe.cache.set_value(key, result, expires_in_sec=ttl)
+	touch(report_name, key)
+	evict(report_name)
+
+	return result
+
+
+def normalise_filters(filters):
+	"""Drop empty values and sort keys / lists so equivalent filters hash alike."""
+	normalised = {}
+	for key, value in (filters or {}).items():
+		if value in (None, "", [], 0, False):
+			continue
+		if isinstance(value, list | tuple | set):
+			value = sorted(str(v) for v in value)
+		else:
+			value = str(value)
+		normalised[key] = value
+
+	return normalised
+
+
+def get_permission_signature(user=None):
+	user = user or frappe.session.user
+	return {
+		"roles": sorted(frappe.get_roles(user)),
+		"user_permissions": frappe.permissions.get_user_permissions(user),
+	}
+
+
+def get_cache_key(report_name, filters, user=None):
+	payload = json.dumps(
+		[normalise_filters(filters), get_permission_signature(user)], sort_keys=True, default=str
+	)
+	digest = hashlib.md5(payload.encode()).hexdigest()
+	return f"{REPORT_CACHE_PREFIX}:{report_name}:{digest}"
+
+
+def get_lru_key(report_name):
+	# sorted set of cache keys scored by last access time
+	return frappe.cache.make_key(f"{REPORT_CACHE_PREFIX}:{report_name}:lru")
+
+
+def touch(report_name, key):
+	frappe.cache.zadd(get_lru_key(report_name), {key: time.time()})
+
+
+def evict(report_name, max_entries=MAX_ENTRIES_PER_REPORT):
+	lru_key = get_lru_key(report_name)
+	overflow = frappe.cache.zcard(lru_key) - max_entries
+	if overflow <= 0:
+		return
+
+	stale = [k.decode() if isinstance(k, bytes) else k for k in frappe.cache.zrange(lru_key, 0, overflow - 1)]
+	frappe.cache.delete_value(stale)
+	frappe.cache.zrem(lru_key, *stale)
+
+
+def clear_report_cache(report_name):
+	lru_key = get_lru_key(report_name)
+	keys = [k.decode() if isinstance(k, bytes) else k for k in frappe.cache.zrange(lru_key, 0, -1)]
+	if keys:
+		frappe.cache.delete_value(keys)
+	frappe.cache.delete(lru_key)
+
+
+def invalidate_report_cache(doc, method=None):
+	"""doc_events handler: clear (or mark stale) every report that depends on `doc.doctype`."""
+	for report_name, doctypes in REPORT_DEPENDENCIES.items():
+		if doc.doctype not in doctypes:
+			continue
+
+		if doc.doctype in THROTTLED_DEPENDENCIES:
+			frappe.cache.set_value(get_stale_key(report_name), 1)
+		else:
+			clear_report_cache(report_name)
+
+
+def get_stale_key(report_name):
+	return f"{REPORT_CACHE_PREFIX}:{report_name}:stale"
+
+
+def clear_if_stale(report_name):
+	"""Clear a report marked stale, unless it was cleared this way in the last STALE_CLEAR_INTERVAL."""
+	stale_key = get_stale_key(report_name)
+	if not frappe.cache.get_value(stale_key):
+		return
+
+	# one clear per interval across all workers
+	cleared_key = frappe.cache.make_key(f"{REPORT_CACHE_PREFIX}:{report_name}:stale_cleared")
+	if not frappe.cache.set(cleared_key, 1, ex=STALE_CLEAR_INTERVAL, nx=True):
+		return
+
+	frappe.cache.delete_value(stale_key)
+	clear_report_cache(report_name)
+
+
+# -------------------- PRE-WARMING -------------------- #
+def get_usage_member(report_name, user, filters):
+	return json.dumps([report_name, user, get_relative_filters(filters)], sort_keys=True, default=str)
+
+
+def record_usage(report_name, filters):
+	member = get_usage_member(report_name, frappe.session.user, filters)
+
+	# a Prepared Report queued by the pre-warm runs in its own job, where the
+	# prewarming flag is not set: its run is not counted as usage
+	if frappe.cache.srem(PREWARM_PENDING_KEY, member):
+		return
+
+	frappe.cache.zincrby(frappe.cache.make_key(USAGE_KEY), 1, member)
+
+
+def get_relative_filters(filters):
+	current_date = today()
+	return {
+		key: TODAY_MARKER if str(value) == current_date else value for key, value in (filters or {}).items()
+	}
+
+
+def resolve_relative_filters(filters):
+	current_date = today()
+	return {key: current_date if value == TODAY_MARKER else value for key, value in filters.items()}
+
+
+def get_report_execute(report_name):
+	"""The undecorated `execute` of a standard script report."""
+	from frappe.desk.query_report import get_report_module_dotted_path
+
+	module = frappe.db.get_value("Report", report_name, "module")
+	return inspect.unwrap(frappe.get_attr(get_report_module_dotted_path(module, report_name) + ".execute"))
+
+
+def enqueue_prepared_report(report_name, filters):
+	"""Queue a Prepared Report for `filters` as the session user, unless one is already there."""
+	from frappe.core.doctype.prepared_report.prepared_report import (
+		make_prepared_report,
+		process_filters_for_prepared_report,
+	)
+
+	if frappe.db.exists(
+		"Prepared Report",
+		{
+			"report_name": report_name,
+			"owner": frappe.session.user,
+			"filters": process_filters_for_prepared_report(filters),
+			"status": ["in", ["Queued", "Started", "Completed"]],
+		},
+	):
+		return
+
+	frappe.cache.sadd(PREWARM_PENDING_KEY, get_usage_member(report_name, frappe.session.user, filters))
+	frappe.cache.expire(frappe.cache.make_key(PREWARM_PENDING_KEY), PREWARM_TTL)
+	make_prepared_report(report_name, filters)
+
+
+def prewarm_report_cache():
+	"""
+	scheduler_events job: recompute the most used (report, user, filters)
+	combinations as their user, so the cache keys (or the Prepared Report
+	owner) match the user's own runs.
+	"""
+	usage_key = frappe.cache.make_key(USAGE_KEY)
+	session_user = frappe.session.user
+
+	frappe.flags.vciplreports_prewarming = True
+	try:
+		for member in frappe.cache.zrevrange(usage_key, 0, PREWARM_TOP_N - 1):
+			report_name, user, filters = json.loads(member)
+			if not frappe.db.get_value("User", user, "enabled"):
+				continue
+
+			filters = resolve_relative_filters(filters)
+
+			frappe.set_user(user)
+			try:
+				if frappe.get_cached_value("Report", report_name, "prepared_report"):
+					enqueue_prepared_report(report_name, filters)
+				else:
+					run_cached(
+						report_name, get_report_execute(report_name), filters, ttl=PREWARM_TTL, refresh=True
+					)
+			except Exception:
+				frappe.log_error(title=f"Report cache pre-warm failed: {report_name}")
+	finally:
+		frappe.flags.vciplreports_prewarming = False
+		frappe.set_user(session_user)
+
+	# halve the counts so old usage fades out, and forget one-off runs
+	frappe.cache.zunionstore(usage_key, {usage_key: 0.5})
+	frappe.cache.zremrangebyscore(usage_key, "-inf", 0.5)
+
+
+def enqueue_prewarm(doc=None, method=None):
+	"""doc_events handler (Period Closing Voucher on_submit): pre-warm after closing."""
+	frappe.enqueue(
+		"vciplreports.utils.report_cache.prewarm_report_cache",
+		queue="long",
+		job_id="vciplreports_prewarm_report_cache",
+		deduplicate=True,
+		enqueue_after_commit=True,
+	)
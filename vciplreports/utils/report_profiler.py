@@ -0,0 +1,256 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+"""
+Opt-in per-stage instrumentation for the vciplreports script reports.
+
+`execute` functions are wrapped with `@profiled_report(<report name>)` and
+mark their stages with `with profile_stage("<name>"):`. Profiling runs when
+the filters carry `profile: 1` or `vciplreports_profile_reports` is set in
+site config; otherwise both are no-ops. Each profiled run records wall time,
+SQL count, SQL time, rows fetched and peak allocated memory per stage, is
+stored as a Report Profile Log, and is shown to System Managers in the
+report message together with the p50 / p95 of earlier runs.
+
+Stages are flat: do not nest `profile_stage` blocks.
+"""
+
+import functools
+import hashlib
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import frappe
+from frappe.utils import add_days, cint, now_datetime
+
+PROFILER_FLAG = "vciplreports_profiler"
+
+# filters whose value (not only presence) changes the work a report does
+SHAPE_VALUE_FILTERS = ("tree_type", "range", "doc_type", "value_quantity", "stock_basis")
+
+SUMMARY_DAYS = 30
+
+
+class ReportProfiler:
+	def __init__(self, report_name):
+		self.report_name = report_name
+		self.stages = []
+		self.query_count = 0
+		self.query_time = 0.0
+		self.rows_fetched = 0
+
+	def start(self):
+		# restored on stop(), so a wrapper installed before this one (Recorder,
+		# an outer profiler) keeps working
+		self.db = db = frappe.db
+		self.original_sql = original_sql = db.sql
+
+		def profiled_sql(*args, **kwargs):
+			start = time.perf_counter()
+			try:
+				result = original_sql(*args, **kwargs)
+			finally:
+				self.query_count += 1
+				self.query_time += time.perf_counter() - start
+
+			if isinstance(result, list | tuple):
+				self.rows_fetched += len(result)
+			return result
+
+		db.sql = profiled_sql
+		tracemalloc.start()
+		self.started = time.perf_counter()
+
+	def stop(self):
+		self.total_time = time.perf_counter() - self.started
+		self.peak_memory = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+		self.db.sql = self.original_sql
+
+	@contextmanager
+	def stage(self, name):
+		query_count, query_time, rows_fetched = self.query_count, self.query_time, self.rows_fetched
+		tracemalloc.reset_peak()
+		start = time.perf_counter()
+
+		try:
+			yield
+		finally:
+			self.stages.append(
+				{
+					"stage": name,
+					"time": round(time.perf_counter() - start, 4),
+					"query_count": self.query_count - query_count,
+					"query_time": round(self.query_time - query_time, 4),
+					"rows_fetched": self.rows_fetched - rows_fetched,
+					"peak_memory": tracemalloc.get_traced_memory()[1],
+				}
+			)
+
+
+def profile_stage(name):
+	"""Context manager timing one stage of the running report (no-op unless profiling)."""
+	profiler = frappe.flags.get(PROFILER_FLAG)
+	return profiler.stage(name) if profiler else nullcontext()
+
+
+def add_rows_fetched(count):
+	"""Count rows read from an iterator / unbuffered cursor for the running report."""
+	profiler = frappe.flags.get(PROFILER_FLAG)
+	if profiler:
+		profiler.rows_fetched += count
+
+
+def is_profiling_enabled(filters):
+	return cint((filters or {}).get("profile")) or cint(frappe.conf.get("vciplreports_profile_reports"))
+
+
+def profiled_report(report_name):
+	"""Decorator for a report's `execute(filters=None)`; wraps the result cache as well."""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters=None):
+			if not is_profiling_enabled(filters):
+				return execute(filters)
+
+			profiler = frappe.flags[PROFILER_FLAG] = ReportProfiler(report_name)
+			profiler.start()
+			try:
+				result = execute(filters)
+			finally:
+				profiler.stop()
+				frappe.flags.pop(PROFILER_FLAG, None)
+
+			result = list(result)
+			try:
+				filter_shape = get_filter_shape(filters)
+				log_profile(profiler, filter_shape, rows=len(result[1] or []))
+
+				if "System Manager" in frappe.get_roles():
+					result += [None] * (3 - len(result))
+					result[2] = "".join(
+						[
+							result[2] or "",
+							get_profile_html(profiler, get_percentiles(report_name, filter_shape)),
+						]
+					)
+			except Exception:
+				# the report itself succeeded; never fail it over its profile
+				frappe.log_error(title=f"Report profile could not be saved: {report_name}")
+
+			return tuple(result)
+
+		return wrapper
+
+	return decorator
+
+
+def get_filter_shape(filters):
+	"""Which filters were set (and the value of the ones that change the query plan)."""
+	shape = []
+	for key, value in sorted((filters or {}).items()):
+		if key == "profile" or value in (None, "", [], 0):
+			continue
+		shape.append(f"{key}={value}" if key in SHAPE_VALUE_FILTERS else key)
+
+	return ", ".join(shape)
+
+
+def get_filter_shape_hash(filter_shape):
+	return hashlib.md5((filter_shape or "").encode()).hexdigest()
+
+
+def log_profile(profiler, filter_shape, rows):
+	frappe.get_doc(
+		{
+			"doctype": "Report Profile Log",
+			"report_name": profiler.report_name,
+			"filter_shape": filter_shape,
+			"filter_shape_hash": get_filter_shape_hash(filter_shape),
+			"user": frappe.session.user,
+			"total_time": profiler.total_time,
+			"query_count": profiler.query_count,
+			"query_time": profiler.query_time,
+			"rows_fetched": profiler.rows_fetched,
+			"rows_returned": rows,
+			"peak_memory": profiler.peak_memory,
+			"stages": json.dumps(profiler.stages, indent=1),
+		}
+	).insert(ignore_permissions=True)
+
+
+def percentile(values, pct):
+	"""Nearest-rank percentile of an already sorted list."""
+	if not values:
+		return None
+	return values[max(0, min(len(values) - 1, round(pct / 100 * len(values)) - 1))]
+
+
+def get_percentiles(report_name, filter_shape, days=SUMMARY_DAYS):
+	times = frappe.get_all(
+		"Report Profile Log",
+		filters={
+			"report_name": report_name,
+			"filter_shape_hash": get_filter_shape_hash(filter_shape),
+			"creation": [">=", add_days(now_datetime(), -days)],
+		},
+		pluck="total_time",
+		order_by="total_time asc",
+	)
+	return frappe._dict(runs=len(times), p50=percentile(times, 50), p95=percentile(times, 95))
+
+
+@frappe.whitelist()
+def get_profile_summary(report_name=None, days=SUMMARY_DAYS):
+	"""p50 / p95 wall time, query count and memory per report and filter shape."""
+	frappe.only_for("System Manager")
+
+	filters = {"creation": [">=", add_days(now_datetime(), -cint(days))]}
+	if report_name:
+		filters["report_name"] = report_name
+
+	groups = {}
+	for d in frappe.get_all(
+		"Report Profile Log",
+		filters=filters,
+		fields=["report_name", "filter_shape", "total_time", "query_count", "peak_memory"],
+	):
+		groups.setdefault((d.report_name, d.filter_shape), []).append(d)
+
+	summary = []
+	for (report, filter_shape), logs in sorted(groups.items()):
+		row = {"report_name": report, "filter_shape": filter_shape, "runs": len(logs)}
+		for metric in ("total_time", "query_count", "peak_memory"):
+			values = sorted(d[metric] for d in logs)
+			row[f"{metric}_p50"] = percentile(values, 50)
+			row[f"{metric}_p95"] = percentile(values, 95)
+		summary.append(row)
+
+	return summary
+
+
+def get_profile_html(profiler, percentiles):
+	rows = "".join(
+		"<tr><td>{stage}</td><td>{time:.3f}s</td><td>{query_count}</td><td>{query_time:.3f}s</td>"
+		"<td>{rows_fetched}</td><td>{memory:.1f} MiB</td></tr>".format(
+			memory=stage["peak_memory"] / 1024 / 1024, **stage
+		)
+		for stage in profiler.stages
+	)
+
+	return f"""
+		<div class="vcipl-report-profile">
+			<p><b>Profile:</b> {profiler.total_time:.3f}s, {profiler.query_count} queries
+			({profiler.query_time:.3f}s), {profiler.rows_fetched} rows fetched,
+			peak {profiler.peak_memory / 1024 / 1024:.1f} MiB.
+			Last {SUMMARY_DAYS} days ({percentiles.runs} runs): p50 {percentiles.p50 or 0:.3f}s,
+			p95 {percentiles.p95 or 0:.3f}s.</p>
+			<table class="table table-bordered table-condensed">
+				<tr><th>Stage</th><th>Time</th><th>Queries</th><th>SQL Time</th><th>Rows</th><th>Peak Memory</th></tr>
+				{rows}
+			</table>
+		</div>
+	"""
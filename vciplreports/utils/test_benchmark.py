@@ -0,0 +1,88 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+import json
+import os
+import tempfile
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from vciplreports.utils import benchmark
+
+TEST_COMPANY = "_Test Company"
+TEST_LINES = 500
+
+
+class TestBenchmark(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.size = benchmark.generate_dataset(TEST_COMPANY, scale=str(TEST_LINES))
+
+	@classmethod
+	def tearDownClass(cls):
+		benchmark.delete_dataset()
+		frappe.db.commit()
+		super().tearDownClass()
+
+	def count_tagged(self, doctype):
+		return frappe.db.count(doctype, {"name": ["like", f"%{benchmark.BENCH_TAG}%"]})
+
+	def test_dataset_size(self):
+		self.assertEqual(self.count_tagged("Sales Invoice"), self.size.invoices)
+		self.assertEqual(
+			frappe.db.count("Sales Invoice Item", {"parent": ["like", f"%{benchmark.BENCH_TAG}%"]}),
+			self.size.invoices * benchmark.LINES_PER_INVOICE,
+		)
+		self.assertEqual(self.count_tagged("Purchase Invoice"), self.size.purchase_invoices)
+		self.assertEqual(self.count_tagged("Sales Order"), self.size.sales_orders)
+		self.assertEqual(self.count_tagged("Customer"), self.size.customers)
+		self.assertEqual(self.count_tagged("Supplier"), self.size.suppliers)
+		self.assertTrue(self.count_tagged("Bin"))
+
+	def test_scenarios_cover_every_tree_type_and_range(self):
+		labels = [label for label, _fn in benchmark.get_scenarios(TEST_COMPANY)]
+
+		for tree_type in benchmark.ANALYTICS_TREE_TYPES:
+			for period_range in benchmark.ANALYTICS_RANGES:
+				self.assertIn(f"Sales Analytic Report / {tree_type} / {period_range}", labels)
+
+		for report in ("Distributor Report", "Monthwise Sales", "Monthwise Purchase"):
+			self.assertIn(report, labels)
+
+	def test_every_analytics_tree_type_has_rows(self):
+		scenarios = dict(benchmark.get_scenarios(TEST_COMPANY))
+
+		for tree_type in benchmark.ANALYTICS_TREE_TYPES:
+			stats = benchmark.measure(scenarios[f"Sales Analytic Report / {tree_type} / Monthly"])
+			self.assertTrue(stats.rows, tree_type)
+			self.assertTrue(stats.query_count, tree_type)
+
+	def test_run_benchmarks_records_metrics(self):
+		results = benchmark.run_benchmarks(TEST_COMPANY)
+
+		for label, stats in results.items():
+			for metric in ("wall_time", "query_count", "query_time", "peak_memory", "rows"):
+				self.assertIn(metric, stats, label)
+
+	def test_compare_with_baseline(self):
+		previous = {
+			"Report": {"wall_time": 1.0, "query_count": 10, "peak_memory": 1000},
+			"Dropped": {"wall_time": 1.0, "query_count": 10, "peak_memory": 1000},
+		}
+		current = {
+			"Report": {"wall_time": 1.5, "query_count": 10, "peak_memory": 1100},
+			"New": {"wall_time": 9.0, "query_count": 99, "peak_memory": 9999},
+		}
+
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, "baseline.json")
+			benchmark.write_baseline(previous, path, scale="10k")
+
+			with open(path) as f:
+				self.assertEqual(json.load(f)["scale"], "10k")
+
+			regressions = benchmark.compare_with_baseline(current, path, tolerance=0.2)
+
+		self.assertEqual(regressions, [("Report", "wall_time", 1.0, 1.5)])
@@ -0,0 +1,115 @@
+# Copyright (c) 2025, AITS and contributors
+# For license information, please see license.txt
+
+"""
+Shared, Redis-backed snapshots of the nested-set trees used by the reports.
+
+Snapshots are built on first use and dropped by the doc_events registered in
+hooks.py whenever a node of the tree (or a Supplier, for the supplier → group
+map) is changed, renamed or deleted. Tree snapshots also carry the tree's
+(max(modified), node count) and are rebuilt on read when it no longer matches,
+so edits that skip the doc_events (bulk SQL, imports without hooks) are seen.
+"""
+
+import frappe
+from frappe import _
+
+TREE_SNAPSHOT_CACHE_KEY = "vciplreports:tree_snapshot"
+
+TREE_PARENT_FIELDS = {
+	"Customer Group": "parent_customer_group",
+	"Item Group": "parent_item_group",
+	"Supplier Group": "parent_supplier_group",
+	"Territory": "parent_territory",
+}
+
+
+def get_tree_snapshot(doctype):
+	"""Return `frappe._dict(nodes, depth_map, version)` for a tree doctype.
+
+	`nodes` are ordered by lft and carry name, lft, rgt and parent.
+	"""
+	version = get_tree_version(doctype)
+
+	snapshot = frappe.cache.hget(TREE_SNAPSHOT_CACHE_KEY, doctype)
+	if not snapshot or snapshot.get("version") != version:
+		snapshot = build_tree_snapshot(doctype, version)
+		frappe.cache.hset(TREE_SNAPSHOT_CACHE_KEY, doctype, snapshot)
+
+	return snapshot
+
+
+def get_tree_version(doctype):
+	"""(max(modified), node count) of the tree; changes with every saved, added or removed node."""
+	return tuple(frappe.db.sql(f"select max(modified), count(*) from `tab{doctype}`")[0])
+
+
+def build_tree_snapshot(doctype, version):
+	parent_field = TREE_PARENT_FIELDS[doctype]
+
+	nodes = frappe.db.sql(
+		f"""select name, lft, rgt, {parent_field} as parent
+		from `tab{doctype}` order by lft""",
+		as_dict=1,
+	)
+
+	depth_map = frappe._dict()
+	for d in nodes:
+		if d.parent:
+			depth_map.setdefault(d.name, depth_map.get(d.parent, -1) + 1)
+		else:
+			depth_map.setdefault(d.name, 0)
+
+	return frappe._dict(
+		nodes=nodes,
+		depth_map=depth_map,
+		version=version,
+	)
+
+
+def get_tree_bounds(doctype, name):
+	"""(lft, rgt) of a tree node, for `lft >= ... and rgt <= ...` subtree filters."""
+	bounds = frappe.db.get_value(doctype, name, ["lft", "rgt"])
+	if not bounds:
+		frappe.throw(_("{0} {1} does not exist").format(_(doctype), frappe.bold(name)))
+
+	return bounds
+
+
+def get_supplier_group_map():
+	"""Supplier → Supplier Group for every supplier."""
+	return frappe.cache.hget(
+		TREE_SNAPSHOT_CACHE_KEY,
+		"Supplier",
+		generator=lambda: frappe._dict(frappe.db.sql("select name, supplier_group from `tabSupplier`")),
+	)
+
+
+def get_sales_person_index():
+	"""Sales Person ancestry index.
+
+	`parent_map` maps each sales person to its parent; `leaf_child` maps a group
+	to its first non-group child in tree order (lowest lft).
+	"""
+	return frappe.cache.hget(TREE_SNAPSHOT_CACHE_KEY, "Sales Person", generator=build_sales_person_index)
+
+
+def build_sales_person_index():
+	parent_map = {}
+	leaf_child = {}
+
+	for d in frappe.db.sql(
+		"""select name, parent_sales_person as parent, is_group
+		from `tabSales Person` order by lft""",
+		as_dict=1,
+	):
+		parent_map[d.name] = d.parent
+		if d.parent and not d.is_group:
+			leaf_child.setdefault(d.parent, d.name)
+
+	return frappe._dict(parent_map=parent_map, leaf_child=leaf_child)
+
+
+def clear_tree_snapshot(doc, method=None):
+	"""doc_events handler: drop the snapshot of the changed doc's tree."""
+	frappe.cache.hdel(TREE_SNAPSHOT_CACHE_KEY, doc.doctype)
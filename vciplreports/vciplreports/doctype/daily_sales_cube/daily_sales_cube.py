@@ -0,0 +1,205 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, flt, getdate, now
+
+# document type -> date field
+CUBE_DOC_TYPES = {
+	"Sales Invoice": "posting_date",
+	"Sales Order": "transaction_date",
+	"Purchase Invoice": "posting_date",
+	"Purchase Order": "transaction_date",
+}
+
+# dimensions identifying one cube row, in the order used for its name
+CUBE_KEY_FIELDS = [
+	"doc_type",
+	"company",
+	"posting_date",
+	"customer",
+	"supplier",
+	"territory",
+	"project",
+	"order_type",
+	"is_opening",
+	"item_code",
+	"item_group",
+]
+
+# header fields copied from the document when the doctype has them
+HEADER_FIELDS = ["customer", "supplier", "territory", "project", "order_type"]
+
+
+class DailySalesCube(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Daily Sales Cube", ["doc_type", "company", "posting_date"])
+	frappe.db.add_index("Daily Sales Cube", ["customer"])
+
+
+def get_cube_name(values):
+	"""Deterministic row name so incremental updates can upsert on the primary key.
+
+	Must stay in sync with the MD5(CONCAT_WS(...)) expression in `rebuild_cube`.
+	"""
+	key = "::".join("" if values.get(field) is None else str(values[field]) for field in CUBE_KEY_FIELDS)
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+def update_cube(doc, method=None):
+	"""doc_events handler for Sales / Purchase Invoice and Order on_submit and on_cancel."""
+	sign = -1 if method == "on_cancel" else 1
+
+	header = {
+		"doc_type": doc.doctype,
+		"company": doc.company,
+		"posting_date": getdate(doc.get(CUBE_DOC_TYPES[doc.doctype])),
+		"is_opening": cint(doc.get("is_opening") == "Yes"),
+		"customer_group": None,
+		"custom_sub_group": None,
+	}
+	for field in HEADER_FIELDS:
+		header[field] = doc.get(field) or None
+
+	if header["customer"]:
+		# current master values, as the Analytics report joins Customer
+		header["customer_group"], header["custom_sub_group"] = frappe.get_cached_value(
+			"Customer", header["customer"], ["customer_group", "custom_sub_group"]
+		) or (None, None)
+
+	rows = {}
+	for item in doc.items:
+		key = (item.item_code, item.item_group)
+		row = rows.setdefault(key, {"value": 0.0, "qty": 0.0, "stock_qty": 0.0})
+		row["value"] += flt(item.base_net_amount)
+		row["qty"] += flt(item.qty)
+		row["stock_qty"] += flt(item.stock_qty)
+
+	for (item_code, item_group), amounts in rows.items():
+		values = {
+			**header,
+			"item_code": item_code,
+			"item_group": item_group,
+			"value": sign * amounts["value"],
+			"qty": sign * amounts["qty"],
+			"stock_qty": sign * amounts["stock_qty"],
+			"now": now(),
+			"user": frappe.session.user,
+		}
+		values["name"] = get_cube_name(values)
+
+		frappe.db.sql(
+			"""insert into `tabDaily Sales Cube`
+				(name, creation, modified, modified_by, owner, docstatus,
+				doc_type, company, posting_date, is_opening, customer, customer_group, custom_sub_group,
+				territory, supplier, project, order_type, item_code, item_group, value, qty, stock_qty)
+			values
+				(%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0,
+				%(doc_type)s, %(company)s, %(posting_date)s, %(is_opening)s, %(customer)s,
+				%(customer_group)s, %(custom_sub_group)s, %(territory)s, %(supplier)s, %(project)s,
+				%(order_type)s, %(item_code)s, %(item_group)s, %(value)s, %(qty)s, %(stock_qty)s)
+			on duplicate key update
+				value = value + values(value),
+				qty = qty + values(qty),
+				stock_qty = stock_qty + values(stock_qty),
+				customer_group = values(customer_group),
+				custom_sub_group = values(custom_sub_group),
+				modified = values(modified),
+				modified_by = values(modified_by)""",
+			values,
+		)
+
+
+def update_customer_dimensions(doc, method=None):
+	"""doc_events handler for Customer on_update: keep group / sub group current."""
+	if not (doc.has_value_changed("customer_group") or doc.has_value_changed("custom_sub_group")):
+		return
+
+	frappe.db.sql(
+		"""update `tabDaily Sales Cube`
+		set customer_group = %s, custom_sub_group = %s
+		where customer = %s""",
+		(doc.customer_group, doc.get("custom_sub_group"), doc.name),
+	)
+
+
+def get_cube_column(field, dimensions):
+	if field in HEADER_FIELDS or field in ("item_code", "item_group"):
+		return f"nullif(ifnull({dimensions[field]}, ''), '')"
+	return dimensions[field]
+
+
+def rebuild_cube(from_date=None, to_date=None):
+	"""Recompute the cube from submitted documents (bench rebuild-daily-sales-cube).
+
+	With a date range, only rows dated inside it are rebuilt.
+	"""
+	values = {"now": now(), "user": frappe.session.user, "from_date": from_date, "to_date": to_date}
+
+	delete_conditions = ""
+	if from_date:
+		delete_conditions += " and posting_date >= %(from_date)s"
+	if to_date:
+		delete_conditions += " and posting_date <= %(to_date)s"
+
+	frappe.db.sql(f"delete from `tabDaily Sales Cube` where 1=1 {delete_conditions}", values)
+
+	for doctype, date_field in CUBE_DOC_TYPES.items():
+		meta = frappe.get_meta(doctype)
+
+		def header(field):
+			return f"p.{field}" if meta.has_field(field) else "null"
+
+		dimensions = {
+			"doc_type": "%(doc_type)s",
+			"company": "p.company",
+			"posting_date": f"p.{date_field}",
+			"customer": header("customer"),
+			"supplier": header("supplier"),
+			"territory": header("territory"),
+			"project": header("project"),
+			"order_type": header("order_type"),
+			"is_opening": "if(p.is_opening = 'Yes', 1, 0)" if meta.has_field("is_opening") else "0",
+			"item_code": "i.item_code",
+			"item_group": "i.item_group",
+		}
+
+		conditions = ""
+		if from_date:
+			conditions += f" and p.{date_field} >= %(from_date)s"
+		if to_date:
+			conditions += f" and p.{date_field} <= %(to_date)s"
+
+		customer_join = ""
+		customer_columns = "null, null"
+		if meta.has_field("customer"):
+			customer_join = "left join `tabCustomer` c on c.name = p.customer"
+			customer_columns = "max(c.customer_group), max(c.custom_sub_group)"
+
+		# NULL and '' share a row name, so they must share a group as well
+		key_parts = [f"ifnull({dimensions[field]}, '')" for field in CUBE_KEY_FIELDS]
+
+		frappe.db.sql(
+			f"""insert into `tabDaily Sales Cube`
+				(name, creation, modified, modified_by, owner, docstatus,
+				doc_type, company, posting_date, customer, supplier, territory, project, order_type,
+				is_opening, item_code, item_group, customer_group, custom_sub_group, value, qty, stock_qty)
+			select
+				md5(concat_ws('::', {", ".join(key_parts)})),
+				%(now)s, %(now)s, %(user)s, %(user)s, 0,
+				{", ".join(get_cube_column(field, dimensions) for field in CUBE_KEY_FIELDS)},
+				{customer_columns},
+				sum(i.base_net_amount), sum(i.qty), sum(i.stock_qty)
+			from `tab{doctype} Item` i
+			join `tab{doctype}` p on p.name = i.parent
+			{customer_join}
+			where p.docstatus = 1 {conditions}
+			group by {", ".join(key_parts[1:])}""",
+			{**values, "doc_type": doctype},
+		)
@@ -0,0 +1,147 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now
+
+MONTH_MATRIX_CACHE_KEY = "vciplreports:month_matrix"
+
+PARTY_FIELDS = {
+	# invoice doctype: (party_type, party field, party group field)
+	"Sales Invoice": ("Customer", "customer", "customer_group"),
+	"Purchase Invoice": ("Supplier", "supplier", "supplier_group"),
+}
+
+
+class MonthwisePartySummary(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("Monthwise Party Summary", ["party_type", "company", "year", "party"])
+
+
+def get_summary_name(party_type, company, party, year, month):
+	"""Deterministic row name so incremental updates can upsert on the primary key.
+
+	Must stay in sync with the MD5(CONCAT_WS(...)) expression in `rebuild_summary`.
+	"""
+	key = "::".join(str(v) for v in (party_type, company, party, year, month))
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+def update_summary(doc, method=None):
+	"""doc_events handler for Sales / Purchase Invoice on_submit and on_cancel."""
+	party_type, party_field, group_field = PARTY_FIELDS[doc.doctype]
+	sign = -1 if method == "on_cancel" else 1
+	posting_date = getdate(doc.posting_date)
+
+	values = {
+		"party_type": party_type,
+		"company": doc.company,
+		"party": doc.get(party_field),
+		"party_group": doc.get(group_field),
+		"year": posting_date.year,
+		"month": posting_date.month,
+		"invoice_count": sign,
+		"grand_total": sign * (doc.grand_total or 0),
+		"now": now(),
+		"user": frappe.session.user,
+	}
+	values["name"] = get_summary_name(
+		party_type, doc.company, values["party"], values["year"], values["month"]
+	)
+
+	frappe.db.sql(
+		"""insert into `tabMonthwise Party Summary`
+			(name, creation, modified, modified_by, owner, docstatus,
+			party_type, company, party, party_group, year, month, invoice_count, grand_total)
+		values
+			(%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, 0,
+			%(party_type)s, %(company)s, %(party)s, %(party_group)s, %(year)s, %(month)s,
+			%(invoice_count)s, %(grand_total)s)
+		on duplicate key update
+			invoice_count = invoice_count + values(invoice_count),
+			grand_total = grand_total + values(grand_total),
+			party_group = ifnull(values(party_group), party_group),
+			modified = values(modified),
+			modified_by = values(modified_by)""",
+		values,
+	)
+
+	frappe.cache.delete_value(MONTH_MATRIX_CACHE_KEY)
+
+
+def get_month_matrix(party_type, company=None, year=None):
+	"""party -> [Jan..Dec amounts] for every party of `party_type`, cached per (company, year)."""
+	cache_field = f"{party_type}:{company or ''}:{year or ''}"
+	return frappe.cache.hget(
+		MONTH_MATRIX_CACHE_KEY,
+		cache_field,
+		generator=lambda: build_month_matrix(party_type, company, year),
+	)
+
+
+def build_month_matrix(party_type, company=None, year=None):
+	conditions = ""
+	values = {"party_type": party_type}
+
+	if company:
+		conditions += " and company = %(company)s"
+		values["company"] = company
+
+	if year:
+		conditions += " and year = %(year)s"
+		values["year"] = int(year)
+
+	matrix = {}
+	for party, month, amount in frappe.db.sql(
+		f"""select party, month, sum(grand_total)
+		from `tabMonthwise Party Summary`
+		where party_type = %(party_type)s {conditions}
+		group by party, month""",
+		values,
+	):
+		matrix.setdefault(party, [0.0] * 12)[month - 1] = flt(amount)
+
+	return matrix
+
+
+def rebuild_summary(year=None):
+	"""Recompute the summary from submitted invoices (bench rebuild-monthwise-summary).
+
+	With `year`, only that calendar year is rebuilt; invoices are then selected
+	with a half-open posting_date range so the date indexes can be used.
+	"""
+	conditions = ""
+	values = {"now": now(), "user": frappe.session.user}
+
+	if year:
+		year = int(year)
+		conditions = "and posting_date >= %(from_date)s and posting_date < %(to_date)s"
+		values.update({"year": year, "from_date": f"{year}-01-01", "to_date": f"{year + 1}-01-01"})
+		frappe.db.sql("delete from `tabMonthwise Party Summary` where year = %(year)s", values)
+	else:
+		frappe.db.sql("delete from `tabMonthwise Party Summary`")
+
+	for doctype, (party_type, party_field, group_field) in PARTY_FIELDS.items():
+		frappe.db.sql(
+			f"""insert into `tabMonthwise Party Summary`
+				(name, creation, modified, modified_by, owner, docstatus,
+				party_type, company, party, party_group, year, month, invoice_count, grand_total)
+			select
+				md5(concat_ws('::', %(party_type)s, company, {party_field},
+					year(posting_date), month(posting_date))),
+				%(now)s, %(now)s, %(user)s, %(user)s, 0,
+				%(party_type)s, company, {party_field}, max({group_field}),
+				year(posting_date), month(posting_date), count(name), sum(grand_total)
+			from `tab{doctype}`
+			where docstatus = 1 {conditions}
+			group by company, {party_field}, year(posting_date), month(posting_date)""",
+			{**values, "party_type": party_type},
+		)
+
+	frappe.cache.delete_value(MONTH_MATRIX_CACHE_KEY)
@@ -7,8 +7,10 @@ frappe.pages['report-dashboard'].on_page_load = function(wrapper) {
 
     $(frappe.render_template("report_dashboard", {})).appendTo(page.body);
 
+    load_kpi_tiles(page);
+
     // Click Routing
-    $(".report-card").on("click", function () {
+    $(page.body).on("click", ".report-card", function () {
         let report_name = $(this).data("report");
 
         // Small click bounce animation
@@ -20,3 +22,36 @@ frappe.pages['report-dashboard'].on_page_load = function(wrapper) {
         }, 120);
     });
 };
+
+// Headline figures come from one cached call; no report is executed here
+function load_kpi_tiles(page) {
+    frappe.call({
+        method: "vciplreports.vciplreports.page.report_dashboard.report_dashboard.get_dashboard_kpis",
+        callback: function (r) {
+            let kpis = r.message || {};
+            let grid = $(page.body).find(".kpi-grid").empty();
+
+            if (!kpis.tiles || !kpis.tiles.length) {
+                grid.append(`<div class="text-muted">${__("Key figures are being computed. Refresh in a few minutes.")}</div>`);
+                return;
+            }
+
+            $(page.body).find(".kpi-computed-on").text(
+                __("as of {0}", [frappe.datetime.comment_when(kpis.computed_on)])
+            );
+
+            kpis.tiles.forEach((tile) => {
+                let value = tile.fieldtype === "Currency"
+                    ? format_currency(tile.value, kpis.currency)
+                    : frappe.format(tile.value, { fieldtype: tile.fieldtype });
+
+                grid.append(`
+                    <div class="dashboard-card ${tile.color} report-card" data-report="${tile.report}">
+                        <div class="kpi-value">${value}</div>
+                        <div class="dashboard-title">${__(tile.label)}</div>
+                    </div>
+                `);
+            });
+        }
+    });
+}
@@ -1,4 +1,107 @@
 import frappe
+from frappe.utils import cint, get_first_day, getdate, now, today
+
+DASHBOARD_KPI_CACHE_KEY = "vciplreports:dashboard_kpis"
+
 
 def get_context(context):
     context.no_cache = True
+
+
+# -------------------- KPI PRE-COMPUTATION (scheduler) -------------------- #
+def refresh_dashboard_kpis():
+    """
+    scheduler_events job: compute the headline figures of every company and
+    store them in one cache entry, so the dashboard never runs a report.
+    """
+    kpis = {
+        company: get_company_kpis(company)
+        for company in frappe.get_all("Company", pluck="name")
+    }
+    frappe.cache.set_value(DASHBOARD_KPI_CACHE_KEY, {"computed_on": now(), "companies": kpis})
+
+
+def get_company_kpis(company):
+    from vciplreports.vciplreports.report.distributor_report.distributor_report import (
+        get_invoice_conditions,
+    )
+    from vciplreports.vciplreports.report.top_selling_below_msl_report import (
+        top_selling_below_msl_report,
+    )
+
+    current = getdate(today())
+
+    # -------- MTD sales / purchase from the monthwise summary table -------- #
+    mtd = dict(frappe.db.sql("""
+        SELECT party_type, SUM(grand_total)
+        FROM `tabMonthwise Party Summary`
+        WHERE company = %s AND year = %s AND month = %s
+        GROUP BY party_type
+    """, (company, current.year, current.month)))
+
+    # -------- Distributor overdue: Total Overdue of the report with its default filters -------- #
+    filters = frappe._dict(company=company, today=today())
+    overdue = frappe.db.sql(f"""
+        SELECT SUM(ps.payment_amount)
+        FROM `tabPayment Schedule` ps
+        JOIN `tabSales Invoice` si ON si.name = ps.parent
+        WHERE ps.parenttype = 'Sales Invoice'
+          AND ps.due_date < %(today)s
+          AND {get_invoice_conditions(filters)}
+    """, filters)[0][0]
+
+    # -------- Top sellers below MSL (report defaults) -------- #
+    msl_filters = frappe._dict(company=company, custom_item_type="Finished Goods")
+    top_selling_below_msl_report.set_date_range(msl_filters)
+    below_msl = sum(
+        1 for row in top_selling_below_msl_report.get_data(msl_filters) if row.shortage_qty > 0
+    )
+
+    return {
+        "sales_mtd": mtd.get("Customer") or 0,
+        "purchase_mtd": mtd.get("Supplier") or 0,
+        "distributor_overdue": overdue or 0,
+        "top_sellers_below_msl": below_msl,
+        "month_start": str(get_first_day(current)),
+    }
+
+
+# -------------------- KPI ENDPOINT (dashboard) -------------------- #
+@frappe.whitelist()
+def get_dashboard_kpis(company=None):
+    """Cached KPI tiles for `company`; only reads the cache filled by the scheduler."""
+    frappe.has_permission("Sales Invoice", throw=True)
+
+    company = company or frappe.defaults.get_user_default("Company") or frappe.defaults.get_global_default("company")
+    cached = frappe.cache.get_value(DASHBOARD_KPI_CACHE_KEY)
+
+    if not cached:
+        # first call after a cache flush: fill it in the background
+        frappe.enqueue(
+            "vciplreports.vciplreports.page.report_dashboard.report_dashboard.refresh_dashboard_kpis",
+            queue="long",
+            job_id="vciplreports_refresh_dashboard_kpis",
+            deduplicate=True,
+        )
+        return {"company": company, "computed_on": None, "tiles": []}
+
+    kpis = cached["companies"].get(company) or {}
+    currency = frappe.get_cached_value("Company", company, "default_currency") if company else None
+
+    tiles = [
+        {"label": "Sales MTD", "value": kpis.get("sales_mtd"), "fieldtype": "Currency",
+         "report": "Monthwise Sales", "color": "blue-card"},
+        {"label": "Purchase MTD", "value": kpis.get("purchase_mtd"), "fieldtype": "Currency",
+         "report": "Monthwise Purchase", "color": "orange-card"},
+        {"label": "Distributor Overdue", "value": kpis.get("distributor_overdue"), "fieldtype": "Currency",
+         "report": "Distributor Report", "color": "purple-card"},
+        {"label": "Top Sellers Below MSL", "value": cint(kpis.get("top_sellers_below_msl")), "fieldtype": "Int",
+         "report": "Top selling below MSL report", "color": "red-card"},
+    ]
+
+    return {
+        "company": company,
+        "currency": currency,
+        "computed_on": cached["computed_on"],
+        "tiles": tiles if kpis else [],
+    }
@@ -3,6 +3,46 @@
 
 frappe.query_reports["Category wise sales"] = {
 	"filters": [
+		{
+			"fieldname": "company",
+			"label": __("Company"),
+			"fieldtype": "Link",
+			"options": "Company",
+			"default": frappe.defaults.get_user_default("Company"),
+			"reqd": 1
+		},
+		{
+			"fieldname": "from_date",
+			"label": __("From Date"),
+			"fieldtype": "Date",
+			"default": frappe.defaults.get_user_default("year_start_date"),
+			"reqd": 1
+		},
+		{
+			"fieldname": "to_date",
+			"label": __("To Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.get_today(),
+			"reqd": 1
+		},
+		{
+			"fieldname": "warehouse",
+			"label": __("Warehouse"),
+			"fieldtype": "Link",
+			"options": "Warehouse"
+		},
+		{
+			"fieldname": "range",
+			"label": __("Range"),
+			"fieldtype": "Select",
+			"options": ["Monthly", "Quarterly", "Yearly"],
+			"default": "Monthly",
+			"reqd": 1
+		}
+	],
 
-	]
+	"tree": true,
+	"name_field": "item_group",
+	"parent_field": "parent_item_group",
+	"initial_depth": 2
 };
@@ -1,9 +1,209 @@
 # Copyright (c) 2025, AITS and contributors
 # For license information, please see license.txt
 
-# import frappe
+import calendar
 
+import frappe
+from erpnext.accounts.utils import get_fiscal_year
+from frappe import _, scrub
+from frappe.utils import flt
 
+from vciplreports.utils.report_cache import cached_report
+from vciplreports.utils.report_profiler import profile_stage, profiled_report
+from vciplreports.utils.tree_cache import get_tree_bounds, get_tree_snapshot
+from vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report import (
+	get_period_date_ranges,
+)
+
+
+@profiled_report("Category wise sales")
+@cached_report("Category wise sales")
 def execute(filters=None):
-	columns, data = [], []
-	return columns, data
+	filters = frappe._dict(filters or {})
+	filters.range = filters.range or "Monthly"
+
+	periods = get_periods(filters)
+	columns = get_columns(periods)
+
+	with profile_stage("sales query"):
+		amounts = get_group_amounts(filters, periods)
+
+	with profile_stage("tree roll-up"):
+		data = get_rows(amounts, periods)
+
+	return columns, data, None, get_chart(data, periods)
+
+
+# -------------------- PERIODS -------------------- #
+def get_periods(filters):
+	"""
+	Periods between from_date and to_date with their end dates and labels, in
+	order. Built like the Sales Analytic Report's: months and quarters start on
+	the from_date month, years on the fiscal year start.
+	"""
+	periods = []
+	for end_date in get_period_date_ranges(filters):
+		if filters.range == "Monthly":
+			label = f"{calendar.month_abbr[end_date.month]} {end_date.year}"
+		elif filters.range == "Quarterly":
+			label = _("Quarter {0} {1}").format((end_date.month - 1) // 3 + 1, end_date.year)
+		else:
+			label = str(get_fiscal_year(end_date, company=filters.company)[0])
+
+		periods.append(frappe._dict(end_date=end_date, label=label, fieldname=scrub(label)))
+
+	return periods
+
+
+# -------------------- COLUMNS -------------------- #
+def get_columns(periods):
+	columns = [
+		{
+			"label": _("Item Group"),
+			"fieldname": "item_group",
+			"fieldtype": "Link",
+			"options": "Item Group",
+			"width": 220,
+		},
+	]
+
+	for period in periods:
+		columns += [
+			{
+				"label": _("{0} Qty").format(period.label),
+				"fieldname": f"{period.fieldname}_qty",
+				"fieldtype": "Float",
+				"width": 110,
+			},
+			{
+				"label": _("{0} Amount").format(period.label),
+				"fieldname": f"{period.fieldname}_amount",
+				"fieldtype": "Currency",
+				"width": 130,
+			},
+		]
+
+	columns += [
+		{"label": _("Total Qty"), "fieldname": "total_qty", "fieldtype": "Float", "width": 110},
+		{"label": _("Total Amount"), "fieldname": "total_amount", "fieldtype": "Currency", "width": 140},
+	]
+
+	return columns
+
+
+# -------------------- DATA -------------------- #
+def get_group_amounts(filters, periods):
+	"""
+	item group -> [qty, amount] per period (flat list, two slots per period),
+	summed in SQL so only one row per (item group, period) is transferred.
+	"""
+	conditions = ""
+	if filters.warehouse:
+		lft, rgt = get_tree_bounds("Warehouse", filters.warehouse)
+		filters.update({"wh_lft": lft, "wh_rgt": rgt})
+		conditions += """ AND sii.warehouse IN (
+			SELECT name FROM `tabWarehouse` WHERE lft >= %(wh_lft)s AND rgt <= %(wh_rgt)s)"""
+
+	# periods are ordered, so the first end date not before the posting date wins
+	bucket = " ".join(
+		f"WHEN si.posting_date <= %(period_end_{idx})s THEN {idx}" for idx in range(len(periods))
+	)
+	filters.update({f"period_end_{idx}": period.end_date for idx, period in enumerate(periods)})
+	width = 2 * len(periods)
+
+	amounts = {}
+	for item_group, idx, qty, amount in frappe.db.sql(
+		f"""
+		SELECT
+			sii.item_group,
+			CASE {bucket} END AS period,
+			SUM(sii.stock_qty),
+			SUM(sii.base_net_amount)
+		FROM `tabSales Invoice Item` sii
+		JOIN `tabSales Invoice` si ON si.name = sii.parent
+		WHERE si.docstatus = 1
+			AND si.company = %(company)s
+			AND si.posting_date BETWEEN %(from_date)s AND %(to_date)s{conditions}
+		GROUP BY sii.item_group, period
+		""",
+		filters,
+	):
+		if idx is None:
+			continue
+
+		row = amounts.setdefault(item_group, [0.0] * width)
+		row[2 * idx] += flt(qty)
+		row[2 * idx + 1] += flt(amount)
+
+	return amounts
+
+
+def get_rows(amounts, periods):
+	"""
+	Roll every group's amounts into all of its ancestors in one lft-ordered pass
+	over the Item Group nested set (a node is closed, and added to the ancestor
+	below it on the stack, once a later node starts beyond its rgt).
+	"""
+	snapshot = get_tree_snapshot("Item Group")
+	width = 2 * len(periods)
+	totals = {}
+	stack = []
+
+	def close_last():
+		node = stack.pop()
+		if stack and node.name in totals:
+			parent = totals.setdefault(stack[-1].name, [0.0] * width)
+			for i, value in enumerate(totals[node.name]):
+				parent[i] += value
+
+	for node in snapshot.nodes:
+		while stack and node.lft > stack[-1].rgt:
+			close_last()
+		if node.name in amounts:
+			totals[node.name] = list(amounts[node.name])
+		stack.append(node)
+
+	while stack:
+		close_last()
+
+	data = []
+	for node in snapshot.nodes:
+		values = totals.get(node.name)
+		if not values:
+			continue
+
+		row = {
+			"item_group": node.name,
+			"parent_item_group": node.parent,
+			"indent": snapshot.depth_map.get(node.name) or 0,
+		}
+		for idx, period in enumerate(periods):
+			row[f"{period.fieldname}_qty"] = values[2 * idx]
+			row[f"{period.fieldname}_amount"] = values[2 * idx + 1]
+
+		row["total_qty"] = sum(values[0::2])
+		row["total_amount"] = sum(values[1::2])
+		data.append(row)
+
+	return data
+
+
+# -------------------- CHART -------------------- #
+def get_chart(data, periods):
+	top_level = [row for row in data if not row["indent"]]
+
+	return {
+		"data": {
+			"labels": [period.label for period in periods],
+			"datasets": [
+				{
+					"name": _("Amount"),
+					"values": [
+						sum(row[f"{period.fieldname}_amount"] for row in top_level) for period in periods
+					],
+				}
+			],
+		},
+		"type": "bar",
+		"fieldtype": "Currency",
+	}
@@ -0,0 +1,27 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from vciplreports.vciplreports.report.category_wise_sales.category_wise_sales import get_periods
+
+
+class TestCategoryWiseSales(FrappeTestCase):
+	def get_end_dates(self, **filters):
+		periods = get_periods(frappe._dict(company="_Test Company", **filters))
+		return [period.end_date for period in periods]
+
+	def test_quarters_start_on_from_date_month(self):
+		# an April fiscal year is four quarters, not parts of two calendar years
+		self.assertEqual(
+			self.get_end_dates(range="Quarterly", from_date="2024-04-01", to_date="2025-03-31"),
+			[getdate("2024-06-30"), getdate("2024-09-30"), getdate("2024-12-31"), getdate("2025-03-31")],
+		)
+
+	def test_last_period_ends_on_to_date(self):
+		self.assertEqual(
+			self.get_end_dates(range="Monthly", from_date="2024-04-15", to_date="2024-06-10"),
+			[getdate("2024-04-30"), getdate("2024-05-31"), getdate("2024-06-10")],
+		)
@@ -1,13 +1,45 @@
 frappe.query_reports["Distributor Report"] = {
 
+    filters: [
+        {
+            fieldname: "company",
+            label: __("Company"),
+            fieldtype: "Link",
+            options: "Company",
+            default: frappe.defaults.get_user_default("Company")
+        },
+        {
+            fieldname: "from_date",
+            label: __("From Date"),
+            fieldtype: "Date"
+        },
+        {
+            fieldname: "to_date",
+            label: __("To Date"),
+            fieldtype: "Date"
+        },
+        {
+            fieldname: "customer",
+            label: __("Distributor"),
+            fieldtype: "Link",
+            options: "Customer"
+        },
+        {
+            fieldname: "outstanding_only",
+            label: __("Outstanding Invoices Only"),
+            fieldtype: "Check",
+            default: 0
+        }
+    ],
+
     // FORMATTER (Makes Invoice Count Clickable)
     formatter: function(value, row, column, data, default_formatter) {
         value = default_formatter(value, row, column, data);
 
         // Make invoice count clickable (opens popup)
-        if (column.fieldname === "invoice_count" && data.invoices) {
-            return `<a style="cursor:pointer; color:#1674E0; font-weight:bold;"
-                onclick='frappe.query_reports["Distributor Report"].show_invoice_popup(${data.invoices})'>
+        if (column.fieldname === "invoice_count" && data && data.customer) {
+            return `<a class="distributor-invoices" data-customer="${encodeURIComponent(data.customer)}"
+                style="cursor:pointer; color:#1674E0; font-weight:bold;">
                 ${value}
             </a>`;
         }
@@ -15,50 +47,98 @@ frappe.query_reports["Distributor Report"] = {
         return value;
     },
 
-    // POPUP FUNCTION - Shows list of invoices for that customer
-    show_invoice_popup(invoices) {
-        let html = `
-            <div style="max-height:500px; overflow-y:auto;">
-            <table class="table table-bordered" style="font-size:13px;">
-                <thead>
-                    <tr>
-                        <th>Invoice No</th>
-                        <th>Posting Date</th>
-                        <th>Outstanding</th>
-                        <th>Overdue</th>
-                    </tr>
-                </thead>
-                <tbody>
-        `;
+    // POPUP FUNCTION - Pages through the invoices of one customer, fetched on demand
+    show_invoice_popup(customer) {
+        const page_length = 20;
+        let start = 0;
 
-        invoices.forEach(inv => {
-            html += `
-                <tr>
-                    <td>
-                        <a href="/app/sales-invoice/${inv.invoice}"
-                           target="_blank"
-                           style="color:#1674E0; font-weight:bold;">
-                            ${inv.invoice}
-                        </a>
-                    </td>
-                    <td>${inv.posting_date}</td>
-                    <td>${format_currency(inv.outstanding)}</td>
-                    <td>${format_currency(inv.overdue)}</td>
-                </tr>
-            `;
+        const dialog = new frappe.ui.Dialog({
+            title: __("Invoice Details") + " - " + customer,
+            size: "large",
+            fields: [{ fieldtype: "HTML", fieldname: "invoices_html" }],
+            primary_action_label: __("Next"),
+            primary_action() {
+                start += page_length;
+                load_page();
+            },
+            secondary_action_label: __("Previous"),
+            secondary_action() {
+                start = Math.max(start - page_length, 0);
+                load_page();
+            }
         });
 
-        html += `
-                </tbody>
-            </table>
-            </div>
-        `;
+        function load_page() {
+            frappe.call({
+                method: "vciplreports.vciplreports.report.distributor_report.distributor_report.get_invoice_details",
+                args: {
+                    customer: customer,
+                    filters: frappe.query_report.get_filter_values(),
+                    start: start,
+                    page_length: page_length
+                },
+                callback: function(r) {
+                    const res = r.message || { invoices: [], total_count: 0 };
+                    let html = `
+                        <div style="max-height:500px; overflow-y:auto;">
+                        <table class="table table-bordered" style="font-size:13px;">
+                            <thead>
+                                <tr>
+                                    <th>Invoice No</th>
+                                    <th>Posting Date</th>
+                                    <th>Outstanding</th>
+                                    <th>Overdue</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                    `;
 
-        frappe.msgprint({
-            title: __("Invoice Details"),
-            indicator: "blue",
-            message: html,
-            wide: true
-        });
+                    res.invoices.forEach(inv => {
+                        html += `
+                            <tr>
+                                <td>
+                                    <a href="/app/sales-invoice/${encodeURIComponent(inv.invoice)}"
+                                       target="_blank"
+                                       style="color:#1674E0; font-weight:bold;">
+                                        ${frappe.utils.escape_html(inv.invoice)}
+                                    </a>
+                                </td>
+                                <td>${frappe.datetime.str_to_user(inv.posting_date)}</td>
+                                <td>${format_currency(inv.outstanding)}</td>
+                                <td>${format_currency(inv.overdue)}</td>
+                            </tr>
+                        `;
+                    });
+
+                    const end = start + res.invoices.length;
+                    html += `
+                            </tbody>
+                        </table>
+                        </div>
+                        <div class="text-muted small">
+                            ${__("Showing {0} - {1} of {2}", [res.total_count ? start + 1 : 0, end, res.total_count])}
+                        </div>
+                    `;
+
+                    dialog.fields_dict.invoices_html.$wrapper.html(html);
+                    dialog.get_primary_btn().prop("disabled", end >= res.total_count);
+                    dialog.get_secondary_btn().prop("disabled", start === 0);
+                }
+            });
+        }
+
+        dialog.show();
+        load_page();
     }
 };
+
+
+// ---------------------------------------------------------
+// DRILL DOWN: INVOICE COUNT → PAGED INVOICE POPUP
+// ---------------------------------------------------------
+$(document).on("click", ".distributor-invoices", function(e) {
+    e.preventDefault();
+
+    const customer = decodeURIComponent($(this).data("customer"));
+    frappe.query_reports["Distributor Report"].show_invoice_popup(customer);
+});
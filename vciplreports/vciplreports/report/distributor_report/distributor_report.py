@@ -1,7 +1,23 @@
+from bisect import bisect_left
+
 import frappe
-from frappe.utils import today, getdate, date_diff
+from frappe.utils import getdate, today
+
+from vciplreports.utils.report_cache import cached_report
+from vciplreports.utils.report_profiler import profile_stage, profiled_report
+from vciplreports.utils.tree_cache import get_sales_person_index
+
+# (fieldname, label, last overdue day in bucket); the last bucket is open-ended
+AGING_BUCKETS = [
+    ("overdue_0_30", "Overdue 0-30", 30),
+    ("overdue_31_60", "Overdue 31-60", 60),
+    ("overdue_61_90", "Overdue 61-90", 90),
+    ("overdue_90_above", "Overdue 90+", None),
+]
 
 
+@profiled_report("Distributor Report")
+@cached_report("Distributor Report")
 def execute(filters=None):
     return get_columns(), get_data(filters)
 
@@ -34,145 +50,125 @@ def get_columns():
          "fieldtype": "Float", "precision": 2, "width": 160},
 
         {"label": "Average Payment Days", "fieldname": "avg_payment_days",
-         "fieldtype": "Float", "precision": 2, "width": 160},
-
-        {"label": "Invoices", "fieldname": "invoices", "fieldtype": "Data", "hidden": 1}
+         "fieldtype": "Float", "precision": 2, "width": 160}
+    ] + [
+        {"label": label, "fieldname": fieldname, "fieldtype": "Currency", "width": 130}
+        for fieldname, label, _upto in AGING_BUCKETS
     ]
 
 
 # -------------------- MAIN DATA LOGIC -------------------- #
 def get_data(filters=None):
+    filters = frappe._dict(filters or {})
+    conditions = get_invoice_conditions(filters)
 
     # ----------------------------------------------------
     # 1. FETCH SALES INVOICES
     # ----------------------------------------------------
-    invoices = frappe.db.sql("""
-        SELECT 
-            si.name AS invoice,
-            si.customer,
-            si.customer_group,
-            si.posting_date,
-            si.outstanding_amount
-        FROM `tabSales Invoice` si
-        WHERE si.docstatus = 1
-          AND si.customer_group = 'Distributor'
-        ORDER BY si.customer
-    """, as_dict=True)
+    with profile_stage("invoices"):
+        invoices = frappe.db.sql(f"""
+            SELECT 
+                si.name AS invoice,
+                si.customer,
+                si.customer_group,
+                si.posting_date,
+                si.outstanding_amount
+            FROM `tabSales Invoice` si
+            WHERE {conditions}
+            ORDER BY si.customer
+        """, filters, as_dict=True)
 
     if not invoices:
         return []
 
     # ----------------------------------------------------
-    # 2. FETCH PAYMENT SCHEDULE (Due Dates)
+    # 2. FETCH PAYMENT SCHEDULE (Due Dates) - selected invoices only
     # ----------------------------------------------------
-    payment_terms = frappe.db.sql("""
-        SELECT parent, payment_amount, due_date
-        FROM `tabPayment Schedule`
-    """, as_dict=True)
+    with profile_stage("payment schedule"):
+        payment_terms = frappe.db.sql(f"""
+            SELECT ps.parent, ps.payment_amount, ps.due_date
+            FROM `tabPayment Schedule` ps
+            JOIN `tabSales Invoice` si ON si.name = ps.parent
+            WHERE ps.parenttype = 'Sales Invoice'
+              AND {conditions}
+        """, filters, as_dict=True)
 
-    pay_map = {}
-    for p in payment_terms:
-        pay_map.setdefault(p.parent, []).append(p)
+    # ----------------------------------------------------
+    # 3. FETCH PAYMENT ENTRY DATA (Actual Payment Dates)
+    # ----------------------------------------------------
+    with profile_stage("payment entries"):
+        payment_refs = frappe.db.sql(f"""
+            SELECT 
+                per.reference_name AS invoice,
+                pe.posting_date AS payment_date
+            FROM `tabPayment Entry Reference` per
+            JOIN `tabPayment Entry` pe ON pe.name = per.parent
+            JOIN `tabSales Invoice` si ON si.name = per.reference_name
+            WHERE per.reference_doctype = 'Sales Invoice'
+              AND pe.docstatus = 1
+              AND {conditions}
+        """, filters, as_dict=True)
 
     # ----------------------------------------------------
-    # 3. GROUP BY CUSTOMER + CALCULATE OVERDUE
+    # 4. AGING STAGE + GROUP BY CUSTOMER
     # ----------------------------------------------------
+    with profile_stage("aging"):
+        aging = get_aging(invoices, payment_terms, payment_refs)
+
     cust_map = {}
 
-    for inv in invoices:
+    for i, inv in enumerate(invoices):
         cust = inv.customer
 
         if cust not in cust_map:
             cust_map[cust] = {
                 "customer_group": inv.customer_group,
                 "customer": cust,
+                "invoice_count": 0,
                 "total_outstanding": 0,
                 "total_overdue": 0,
-                "invoices_detail": []
+                "overdue_days_total": 0,
+                "payment_days_total": 0,
+                "payment_count": 0,
+                "aging": [0] * len(AGING_BUCKETS)
             }
 
-        cust_map[cust]["total_outstanding"] += inv.outstanding_amount
-
-        overdue_amount = 0
-        overdue_days_list = []
+        row = cust_map[cust]
+        row["invoice_count"] += 1
+        row["total_outstanding"] += inv.outstanding_amount
+        row["total_overdue"] += aging.overdue[i]
+        row["overdue_days_total"] += aging.avg_overdue_days[i]
+        row["payment_days_total"] += aging.payment_days[i]
+        row["payment_count"] += aging.payment_count[i]
 
-        for term in pay_map.get(inv.invoice, []):
-            if term.due_date and getdate(today()) > getdate(term.due_date):
-                overdue_amount += term.payment_amount
-                overdue_days_list.append(date_diff(today(), term.due_date))
-
-        avg_overdue_days = (sum(overdue_days_list) / len(overdue_days_list)) if overdue_days_list else 0
-        cust_map[cust]["total_overdue"] += overdue_amount
-
-        cust_map[cust]["invoices_detail"].append({
-            "invoice": inv.invoice,
-            "posting_date": str(inv.posting_date),
-            "outstanding": float(inv.outstanding_amount),
-            "overdue": float(overdue_amount),
-            "avg_overdue_days": avg_overdue_days
-        })
-
-    # ----------------------------------------------------
-    # 4. FETCH PAYMENT ENTRY DATA (Actual Payment Dates)
-    # ----------------------------------------------------
-    payment_refs = frappe.db.sql("""
-        SELECT 
-            per.reference_name AS invoice,
-            pe.posting_date AS payment_date
-        FROM `tabPayment Entry Reference` per
-        JOIN `tabPayment Entry` pe ON pe.name = per.parent
-        WHERE per.reference_doctype = 'Sales Invoice'
-          AND pe.docstatus = 1
-    """, as_dict=True)
-
-    payment_map = {}
-    for p in payment_refs:
-        payment_map.setdefault(p.invoice, []).append(p.payment_date)
+        for b in range(len(AGING_BUCKETS)):
+            row["aging"][b] += aging.buckets[b][i]
 
     # ----------------------------------------------------
     # 5. FETCH SALES TEAM (ASM / RSM)
     # ----------------------------------------------------
-    sales_team = frappe.db.get_all(
-        "Sales Team",
-        filters={"parenttype": "Customer"},
-        fields=["parent", "sales_person"]
-    )
-    sales_map = {s.parent: s.sales_person for s in sales_team}
+    with profile_stage("sales team"):
+        sales_team = frappe.db.get_all(
+            "Sales Team",
+            filters={"parenttype": "Customer", "parent": ["in", list(cust_map)]},
+            fields=["parent", "sales_person"]
+        )
+        sales_map = {s.parent: s.sales_person for s in sales_team}
 
     # ----------------------------------------------------
     # 6. IDENTIFY ASM / RSM THROUGH SALES PERSON TREE
     # ----------------------------------------------------
-    for cust, row in cust_map.items():
-
-        sp = sales_map.get(cust)
-        asm = None
-        rsm = None
-
-        while sp:
-            parent_sp = frappe.db.get_value("Sales Person", sp, "parent_sales_person")
-            if not parent_sp:
-                break
+    with profile_stage("asm / rsm walk"):
+        sales_person_index = get_sales_person_index()
+        asm_rsm_map = {}
 
-            # Find ASM person
-            if parent_sp.startswith("ASM"):
-                asm = frappe.db.get_value(
-                    "Sales Person",
-                    {"parent_sales_person": parent_sp, "is_group": 0},
-                    "name"
-                )
+        for cust, row in cust_map.items():
 
-            # Find RSM person
-            if parent_sp.startswith("RSM"):
-                rsm = frappe.db.get_value(
-                    "Sales Person",
-                    {"parent_sales_person": parent_sp, "is_group": 0},
-                    "name"
-                )
+            sp = sales_map.get(cust)
+            if sp not in asm_rsm_map:
+                asm_rsm_map[sp] = get_asm_rsm(sp, sales_person_index)
 
-            sp = parent_sp
-
-        row["asm"] = asm
-        row["rsm"] = rsm
+            row["asm"], row["rsm"] = asm_rsm_map[sp]
 
     # ----------------------------------------------------
     # 7. FINAL RESULT COMPILATION
@@ -180,35 +176,217 @@ def get_data(filters=None):
     result = []
 
     for cust, row in cust_map.items():
-
-        # Overdue day average (already stored)
-        overdue_days_list = [i["avg_overdue_days"] for i in row["invoices_detail"]]
-        avg_days_customer = (sum(overdue_days_list) / len(overdue_days_list)) if overdue_days_list else 0
-
-        # ---------------- AVERAGE PAYMENT DAYS ---------------- #
-        payment_days_list = []
-
-        for inv in row["invoices_detail"]:
-            invoice_date = getdate(inv["posting_date"])
-            payments = payment_map.get(inv["invoice"], [])
-
-            for pay_date in payments:
-                payment_days_list.append(date_diff(pay_date, invoice_date))
-
-        avg_payment_days = (sum(payment_days_list) / len(payment_days_list)) if payment_days_list else 0
+        avg_payment_days = (
+            row["payment_days_total"] / row["payment_count"] if row["payment_count"] else 0
+        )
 
         # ---------------- FINAL ROW ---------------- #
-        result.append({
+        result_row = {
             "customer_group": row["customer_group"],
             "customer": cust,
             "asm": row["asm"],
             "rsm": row["rsm"],
-            "invoice_count": len(row["invoices_detail"]),
+            "invoice_count": row["invoice_count"],
             "total_outstanding": row["total_outstanding"],
             "total_overdue": row["total_overdue"],
-            "avg_overdue_days": avg_days_customer,
-            "avg_payment_days": avg_payment_days,
-            "invoices": frappe.as_json(row["invoices_detail"])
-        })
+            "avg_overdue_days": row["overdue_days_total"] / row["invoice_count"],
+            "avg_payment_days": avg_payment_days
+        }
+        for (fieldname, _label, _upto), amount in zip(AGING_BUCKETS, row["aging"], strict=True):
+            result_row[fieldname] = amount
+
+        result.append(result_row)
 
     return result
+
+
+# -------------------- AGING -------------------- #
+def get_aging(invoices, payment_terms, payment_refs):
+    """
+    Batch aging stage over the fetched rows.
+
+    Every date is turned into an ordinal once and the math runs over flat lists
+    indexed like `invoices`:
+    - overdue / avg_overdue_days: from payment schedule terms past due today
+    - buckets: overdue amount split into AGING_BUCKETS by days overdue
+    - payment_days / payment_count: sum and count of (payment date - posting date)
+
+    The three result sets come from separate queries, so terms and payments of
+    an invoice submitted in between (not in `invoices`) are skipped.
+    """
+    today_ordinal = getdate(today()).toordinal()
+    bucket_limits = [upto for _fieldname, _label, upto in AGING_BUCKETS[:-1]]
+
+    n = len(invoices)
+    index = {inv.invoice: i for i, inv in enumerate(invoices)}
+    posting = [inv.posting_date.toordinal() for inv in invoices]
+
+    overdue = [0] * n
+    overdue_days = [0] * n
+    overdue_terms = [0] * n
+    buckets = [[0] * n for _bucket in AGING_BUCKETS]
+
+    for term in payment_terms:
+        if not term.due_date:
+            continue
+
+        days = today_ordinal - term.due_date.toordinal()
+        if days <= 0:
+            continue
+
+        i = index.get(term.parent)
+        if i is None:
+            continue
+
+        overdue[i] += term.payment_amount
+        overdue_days[i] += days
+        overdue_terms[i] += 1
+        buckets[bisect_left(bucket_limits, days)][i] += term.payment_amount
+
+    payment_days = [0] * n
+    payment_count = [0] * n
+
+    for ref in payment_refs:
+        i = index.get(ref.invoice)
+        if i is None:
+            continue
+
+        payment_days[i] += ref.payment_date.toordinal() - posting[i]
+        payment_count[i] += 1
+
+    return frappe._dict(
+        overdue=overdue,
+        avg_overdue_days=[d / c if c else 0 for d, c in zip(overdue_days, overdue_terms, strict=True)],
+        buckets=buckets,
+        payment_days=payment_days,
+        payment_count=payment_count
+    )
+
+
+def get_overdue(terms):
+    """Overdue amount and average overdue days of one invoice's payment schedule."""
+    today_ordinal = getdate(today()).toordinal()
+    overdue_amount = 0
+    overdue_days_list = []
+
+    for term in terms:
+        if term.due_date:
+            days = today_ordinal - term.due_date.toordinal()
+            if days > 0:
+                overdue_amount += term.payment_amount
+                overdue_days_list.append(days)
+
+    avg_overdue_days = (sum(overdue_days_list) / len(overdue_days_list)) if overdue_days_list else 0
+    return overdue_amount, avg_overdue_days
+
+
+# -------------------- INVOICE DRILL-DOWN (POPUP) -------------------- #
+@frappe.whitelist()
+def get_invoice_details(customer, filters=None, start=0, page_length=20):
+    """
+    One page of a distributor's invoices (newest first) with overdue figures,
+    loaded on demand by the Invoice Count popup.
+    """
+    frappe.has_permission("Sales Invoice", throw=True)
+
+    filters = frappe._dict(frappe.parse_json(filters) if filters else {})
+    filters.customer = customer
+    filters.start = frappe.utils.cint(start)
+    filters.page_length = frappe.utils.cint(page_length) or 20
+
+    conditions = get_invoice_conditions(filters)
+
+    total_count = frappe.db.sql(f"""
+        SELECT COUNT(*) FROM `tabSales Invoice` si WHERE {conditions}
+    """, filters)[0][0]
+
+    invoices = frappe.db.sql(f"""
+        SELECT si.name AS invoice, si.posting_date, si.outstanding_amount
+        FROM `tabSales Invoice` si
+        WHERE {conditions}
+        ORDER BY si.posting_date DESC, si.name DESC
+        LIMIT %(page_length)s OFFSET %(start)s
+    """, filters, as_dict=True)
+
+    pay_map = {}
+    if invoices:
+        for p in frappe.db.sql("""
+            SELECT parent, payment_amount, due_date
+            FROM `tabPayment Schedule`
+            WHERE parenttype = 'Sales Invoice' AND parent IN %(invoices)s
+        """, {"invoices": tuple(inv.invoice for inv in invoices)}, as_dict=True):
+            pay_map.setdefault(p.parent, []).append(p)
+
+    rows = []
+    for inv in invoices:
+        overdue_amount, avg_overdue_days = get_overdue(pay_map.get(inv.invoice, []))
+        rows.append({
+            "invoice": inv.invoice,
+            "posting_date": str(inv.posting_date),
+            "outstanding": float(inv.outstanding_amount),
+            "overdue": float(overdue_amount),
+            "avg_overdue_days": avg_overdue_days
+        })
+
+    return {"invoices": rows, "total_count": total_count, "start": filters.start}
+
+
+# -------------------- INVOICE SCOPE -------------------- #
+def get_invoice_conditions(filters):
+    """
+    WHERE clause (alias `si`) selecting the Distributor invoices in scope.
+    Shared by every query so child tables are only read for these invoices.
+    """
+    conditions = [
+        "si.docstatus = 1",
+        "si.customer_group = 'Distributor'",
+    ]
+
+    if filters.get("company"):
+        conditions.append("si.company = %(company)s")
+
+    if filters.get("from_date"):
+        conditions.append("si.posting_date >= %(from_date)s")
+
+    if filters.get("to_date"):
+        conditions.append("si.posting_date <= %(to_date)s")
+
+    if filters.get("customer"):
+        conditions.append("si.customer = %(customer)s")
+
+    if filters.get("outstanding_only"):
+        conditions.append("si.outstanding_amount > 0")
+
+    return " AND ".join(conditions)
+
+
+# -------------------- SALES PERSON HIERARCHY -------------------- #
+def get_asm_rsm(sales_person, sales_person_index):
+    """
+    Walk up from `sales_person` through the cached Sales Person tree.
+    For every ancestor named ASM... / RSM... the non-group person under it with
+    the lowest lft is taken, and the highest such ancestor wins. The original
+    per-row get_value had no ORDER BY, so when a group has several non-group
+    children the pick is now the first in tree order rather than whichever row
+    the database returned first.
+    """
+    asm = None
+    rsm = None
+
+    sp = sales_person
+    while sp:
+        parent_sp = sales_person_index.parent_map.get(sp)
+        if not parent_sp:
+            break
+
+        # Find ASM person
+        if parent_sp.startswith("ASM"):
+            asm = sales_person_index.leaf_child.get(parent_sp)
+
+        # Find RSM person
+        if parent_sp.startswith("RSM"):
+            rsm = sales_person_index.leaf_child.get(parent_sp)
+
+        sp = parent_sp
+
+    return asm, rsm
@@ -6,24 +6,73 @@ frappe.query_reports["Monthwise Purchase"] = {
             e.preventDefault();
 
             let supplier = $(this).data("supplier");
-            let filters = report.get_values();
-
-            frappe.call({
-                method: "your_app.your_module.monthwise_purchase.get_month_breakup",
-                args: {
-                    supplier: supplier,
-                    company: filters.company,
-                    year: filters.year
-                },
-                callback: function(r) {
-                    frappe.msgprint({
-                        title: "Month-wise Purchase for: " + supplier,
-                        indicator: "blue",
-                        message: r.message
-                    });
-                }
+            const me = frappe.query_reports["Monthwise Purchase"];
+
+            me.load_month_matrix([supplier]).then(matrix => {
+                frappe.msgprint({
+                    title: "Month-wise Purchase for: " + supplier,
+                    indicator: "blue",
+                    message: me.month_breakup_html(matrix, supplier)
+                });
             });
         });
 
+    },
+
+    // Prefetch the month matrix for every supplier shown, in one call
+    after_datatable_render: function () {
+        const suppliers = (frappe.query_report.data || [])
+            .map(d => d.supplier && $(`<div>${d.supplier}</div>`).find(".supplier-link").data("supplier"))
+            .filter(Boolean);
+        frappe.query_reports["Monthwise Purchase"].load_month_matrix(suppliers);
+    },
+
+    month_matrix: null,
+    month_matrix_key: null,
+
+    load_month_matrix(suppliers) {
+        const filters = frappe.query_report.get_values();
+        const key = `${filters.company || ""}::${filters.year || ""}`;
+
+        if (this.month_matrix_key !== key) {
+            this.month_matrix = { months: [], data: {} };
+            this.month_matrix_key = key;
+        }
+
+        const missing = suppliers.filter(s => !(s in this.month_matrix.data));
+        if (!missing.length) {
+            return Promise.resolve(this.month_matrix);
+        }
+
+        return frappe.call({
+            method: "vciplreports.vciplreports.report.monthwise_purchase.monthwise_purchase.get_month_breakup_batch",
+            args: { suppliers: missing, company: filters.company, year: filters.year }
+        }).then(r => {
+            if (this.month_matrix_key === key && r.message) {
+                this.month_matrix.months = r.message.months;
+                Object.assign(this.month_matrix.data, r.message.data);
+            }
+            return this.month_matrix;
+        });
+    },
+
+    month_breakup_html(matrix, supplier) {
+        const amounts = matrix.data[supplier] || [];
+        const rows = matrix.months
+            .map((month, i) => [month, amounts[i] || 0])
+            .filter(([_month, amount]) => amount);
+
+        if (!rows.length) {
+            return "<b>No data found</b>";
+        }
+
+        let html = "<h4>Month-wise Purchase</h4>";
+        html += "<table class='table table-bordered'>";
+        html += "<tr><th>Month</th><th>Amount</th></tr>";
+        rows.forEach(([month, amount]) => {
+            html += `<tr><td>${month}</td><td>${format_currency(amount)}</td></tr>`;
+        });
+        html += "</table>";
+        return html;
     }
 };
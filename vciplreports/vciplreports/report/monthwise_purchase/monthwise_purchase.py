@@ -1,8 +1,23 @@
+import calendar
+
 import frappe
 
+from vciplreports.utils.report_cache import cached_report
+from vciplreports.utils.report_profiler import profile_stage, profiled_report
+from vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary import (
+    get_month_matrix,
+)
+
+
+@profiled_report("Monthwise Purchase")
+@cached_report("Monthwise Purchase")
 def execute(filters=None):
     filters = filters or {}
-    return get_columns(), get_data(filters)
+
+    with profile_stage("summary query"):
+        data = get_data(filters)
+
+    return get_columns(), data
 
 
 def get_columns():
@@ -22,27 +37,29 @@ def get_columns():
 
 
 def get_data(filters):
+    # Read from the incrementally maintained Monthwise Party Summary
+    # (one row per company / supplier / year / month) instead of raw invoices.
     sql = """
         SELECT 
-            pi.supplier_group,
-            CONCAT('<a href="#" class="supplier-link" data-supplier="', pi.supplier, '">', pi.supplier, '</a>') AS supplier,
-            COUNT(pi.name) AS invoice_count,
-            SUM(pi.grand_total) AS total_amount
-        FROM `tabPurchase Invoice` pi
-        WHERE pi.docstatus = 1
+            s.party_group AS supplier_group,
+            CONCAT('<a href="#" class="supplier-link" data-supplier="', s.party, '">', s.party, '</a>') AS supplier,
+            SUM(s.invoice_count) AS invoice_count,
+            SUM(s.grand_total) AS total_amount
+        FROM `tabMonthwise Party Summary` s
+        WHERE s.party_type = 'Supplier'
     """
 
     values = []
 
     if filters.get("company"):
-        sql += " AND pi.company = %s"
+        sql += " AND s.company = %s"
         values.append(filters.get("company"))
 
     if filters.get("year"):
-        sql += " AND YEAR(pi.posting_date) = %s"
+        sql += " AND s.year = %s"
         values.append(int(filters.get("year")))
 
-    sql += " GROUP BY pi.supplier ORDER BY pi.supplier"
+    sql += " GROUP BY s.party HAVING SUM(s.invoice_count) > 0 ORDER BY s.party"
 
     return frappe.db.sql(sql, values, as_dict=True)
 
@@ -53,10 +70,10 @@ def get_data(filters):
 def get_month_breakup(supplier, company=None, year=None):
     sql = """
         SELECT 
-            DATE_FORMAT(posting_date, '%%b') AS month,
+            month,
             SUM(grand_total) AS amount
-        FROM `tabPurchase Invoice`
-        WHERE docstatus = 1 AND supplier = %s
+        FROM `tabMonthwise Party Summary`
+        WHERE party_type = 'Supplier' AND party = %s
     """
 
     values = [supplier]
@@ -66,10 +83,10 @@ def get_month_breakup(supplier, company=None, year=None):
         values.append(company)
 
     if year:
-        sql += " AND YEAR(posting_date) = %s"
+        sql += " AND year = %s"
         values.append(int(year))
 
-    sql += " GROUP BY MONTH(posting_date) ORDER BY MONTH(posting_date)"
+    sql += " GROUP BY month HAVING SUM(invoice_count) > 0 ORDER BY month"
 
     data = frappe.db.sql(sql, tuple(values), as_dict=True)
 
@@ -81,7 +98,24 @@ def get_month_breakup(supplier, company=None, year=None):
     html += "<tr><th>Month</th><th>Amount</th></tr>"
 
     for d in data:
-        html += f"<tr><td>{d.month}</td><td>{frappe.utils.fmt_money(d.amount)}</td></tr>"
+        html += f"<tr><td>{calendar.month_abbr[d.month]}</td><td>{frappe.utils.fmt_money(d.amount)}</td></tr>"
 
     html += "</table>"
     return html
+
+
+@frappe.whitelist()
+def get_month_breakup_batch(suppliers, company=None, year=None):
+    """
+    Month-wise amounts for many suppliers at once as a compact matrix:
+    {"months": ["Jan", ..., "Dec"], "data": {supplier: [12 amounts]}}
+    """
+    frappe.has_permission("Purchase Invoice", throw=True)
+
+    suppliers = frappe.parse_json(suppliers) or []
+    matrix = get_month_matrix("Supplier", company, year)
+
+    return {
+        "months": list(calendar.month_abbr)[1:],
+        "data": {p: matrix.get(p, [0.0] * 12) for p in suppliers},
+    }
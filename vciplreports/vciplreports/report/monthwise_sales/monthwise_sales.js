@@ -12,28 +12,77 @@ frappe.query_reports["Monthwise Sales"] = {
             });
         });
 
-        // -------- Amount Click → Popup Breakdown --------
+        // -------- Amount Click → Popup Breakdown (from prefetched matrix) --------
         report.page.on("click", ".amt-click", function () {
             let customer = $(this).data("customer");
+            const me = frappe.query_reports["Monthwise Sales"];
 
-            frappe.call({
-                method: "your_app.your_app.report.monthwise_sales.monthwise_sales.get_month_breakup",
-                args: {
-                    customer: customer,
-                    company: frappe.query_report.get_filter_value("company"),
-                    year: frappe.query_report.get_filter_value("year")
-                },
-                callback: function (r) {
-                    frappe.msgprint({
-                        title: "Month-wise Sales - " + customer,
-                        message: r.message,
-                        wide: true
-                    });
-                }
+            me.load_month_matrix([customer]).then(matrix => {
+                frappe.msgprint({
+                    title: "Month-wise Sales - " + customer,
+                    message: me.month_breakup_html(matrix, customer),
+                    wide: true
+                });
             });
         });
     },
 
+    // Prefetch the month matrix for every customer shown, in one call
+    after_datatable_render: function () {
+        const customers = (frappe.query_report.data || []).map(d => d.customer).filter(Boolean);
+        frappe.query_reports["Monthwise Sales"].load_month_matrix(customers);
+    },
+
+    month_matrix: null,
+    month_matrix_key: null,
+
+    load_month_matrix(customers) {
+        const company = frappe.query_report.get_filter_value("company");
+        const year = frappe.query_report.get_filter_value("year");
+        const key = `${company || ""}::${year || ""}`;
+
+        if (this.month_matrix_key !== key) {
+            this.month_matrix = { months: [], data: {} };
+            this.month_matrix_key = key;
+        }
+
+        const missing = customers.filter(c => !(c in this.month_matrix.data));
+        if (!missing.length) {
+            return Promise.resolve(this.month_matrix);
+        }
+
+        return frappe.call({
+            method: "vciplreports.vciplreports.report.monthwise_sales.monthwise_sales.get_month_breakup_batch",
+            args: { customers: missing, company: company, year: year }
+        }).then(r => {
+            if (this.month_matrix_key === key && r.message) {
+                this.month_matrix.months = r.message.months;
+                Object.assign(this.month_matrix.data, r.message.data);
+            }
+            return this.month_matrix;
+        });
+    },
+
+    month_breakup_html(matrix, customer) {
+        const amounts = matrix.data[customer] || [];
+        const rows = matrix.months
+            .map((month, i) => [month, amounts[i] || 0])
+            .filter(([_month, amount]) => amount);
+
+        if (!rows.length) {
+            return "<b>No data found</b>";
+        }
+
+        let html = "<h4>Month-wise Sales</h4>";
+        html += "<table class='table table-bordered'>";
+        html += "<tr><th>Month</th><th>Amount</th></tr>";
+        rows.forEach(([month, amount]) => {
+            html += `<tr><td>${month}</td><td>${format_currency(amount)}</td></tr>`;
+        });
+        html += "</table>";
+        return html;
+    },
+
     formatter: function (value, row, column, data, default_formatter) {
         value = default_formatter(value, row, column, data);
 
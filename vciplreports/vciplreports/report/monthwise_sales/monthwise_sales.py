@@ -1,8 +1,23 @@
+import calendar
+
 import frappe
 
+from vciplreports.utils.report_cache import cached_report
+from vciplreports.utils.report_profiler import profile_stage, profiled_report
+from vciplreports.vciplreports.doctype.monthwise_party_summary.monthwise_party_summary import (
+    get_month_matrix,
+)
+
+
+@profiled_report("Monthwise Sales")
+@cached_report("Monthwise Sales")
 def execute(filters=None):
     filters = filters or {}
-    return get_columns(), get_data(filters)
+
+    with profile_stage("summary query"):
+        data = get_data(filters)
+
+    return get_columns(), data
 
 
 def get_columns():
@@ -22,27 +37,29 @@ def get_columns():
 
 
 def get_data(filters):
+    # Read from the incrementally maintained Monthwise Party Summary
+    # (one row per company / customer / year / month) instead of raw invoices.
     sql = """
         SELECT 
-            si.customer_group,
-            si.customer,
-            COUNT(si.name) AS invoice_count,
-            SUM(si.grand_total) AS total_amount
-        FROM `tabSales Invoice` si
-        WHERE si.docstatus = 1
+            s.party_group AS customer_group,
+            s.party AS customer,
+            SUM(s.invoice_count) AS invoice_count,
+            SUM(s.grand_total) AS total_amount
+        FROM `tabMonthwise Party Summary` s
+        WHERE s.party_type = 'Customer'
     """
 
     values = []
 
     if filters.get("company"):
-        sql += " AND si.company = %s"
+        sql += " AND s.company = %s"
         values.append(filters.get("company"))
 
     if filters.get("year"):
-        sql += " AND YEAR(si.posting_date) = %s"
+        sql += " AND s.year = %s"
         values.append(int(filters.get("year")))
 
-    sql += " GROUP BY si.customer ORDER BY si.customer"
+    sql += " GROUP BY s.party HAVING SUM(s.invoice_count) > 0 ORDER BY s.party"
 
     return frappe.db.sql(sql, values, as_dict=True)
 
@@ -53,10 +70,10 @@ def get_data(filters):
 def get_month_breakup(customer, company=None, year=None):
     sql = """
         SELECT 
-            DATE_FORMAT(posting_date, '%%b') AS month,
+            month,
             SUM(grand_total) AS amount
-        FROM `tabSales Invoice`
-        WHERE docstatus = 1 AND customer = %s
+        FROM `tabMonthwise Party Summary`
+        WHERE party_type = 'Customer' AND party = %s
     """
 
     values = [customer]
@@ -66,10 +83,10 @@ def get_month_breakup(customer, company=None, year=None):
         values.append(company)
 
     if year:
-        sql += " AND YEAR(posting_date) = %s"
+        sql += " AND year = %s"
         values.append(int(year))
 
-    sql += " GROUP BY MONTH(posting_date) ORDER BY MONTH(posting_date)"
+    sql += " GROUP BY month HAVING SUM(invoice_count) > 0 ORDER BY month"
 
     data = frappe.db.sql(sql, tuple(values), as_dict=True)
 
@@ -81,7 +98,24 @@ def get_month_breakup(customer, company=None, year=None):
     html += "<tr><th>Month</th><th>Amount</th></tr>"
 
     for d in data:
-        html += f"<tr><td>{d.month}</td><td>{frappe.utils.fmt_money(d.amount)}</td></tr>"
+        html += f"<tr><td>{calendar.month_abbr[d.month]}</td><td>{frappe.utils.fmt_money(d.amount)}</td></tr>"
 
     html += "</table>"
     return html
+
+
+@frappe.whitelist()
+def get_month_breakup_batch(customers, company=None, year=None):
+    """
+    Month-wise amounts for many customers at once as a compact matrix:
+    {"months": ["Jan", ..., "Dec"], "data": {customer: [12 amounts]}}
+    """
+    frappe.has_permission("Sales Invoice", throw=True)
+
+    customers = frappe.parse_json(customers) or []
+    matrix = get_month_matrix("Customer", company, year)
+
+    return {
+        "months": list(calendar.month_abbr)[1:],
+        "data": {p: matrix.get(p, [0.0] * 12) for p in customers},
+    }
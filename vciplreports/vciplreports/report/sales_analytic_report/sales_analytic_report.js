@@ -2,6 +2,39 @@ frappe.query_reports["Sales Analytic Report"] = {
     onload: function (report) {
         // Enable tree structure visually
         report.tree_report = true;
+
+        // Large trees: build the file in the background, row by row
+        report.page.add_menu_item(__("Streaming Export"), function () {
+            frappe.prompt(
+                {
+                    fieldname: "file_format",
+                    label: __("File Format"),
+                    fieldtype: "Select",
+                    options: ["Excel", "CSV"],
+                    default: "Excel"
+                },
+                (values) => {
+                    frappe.call({
+                        method: "vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report.export_report",
+                        args: {
+                            filters: report.get_filter_values(),
+                            file_format: values.file_format
+                        },
+                        callback: (r) => frappe.show_alert(r.message)
+                    });
+                },
+                __("Streaming Export")
+            );
+        });
+
+        frappe.realtime.off("sales_analytic_export_ready");
+        frappe.realtime.on("sales_analytic_export_ready", (data) => {
+            frappe.msgprint({
+                title: __("Export Ready"),
+                indicator: "green",
+                message: `<a href="${data.file_url}" target="_blank">${__("Download")}</a>`
+            });
+        });
     },
 
     formatter: function (value, row, column, data, default_formatter) {
@@ -1,15 +1,80 @@
 # Copyright (c) 2013, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+from array import array
+from bisect import bisect_left
+
 import frappe
 from frappe import _, scrub
-from frappe.query_builder import DocType
-from frappe.query_builder.functions import IfNull
-from frappe.utils import add_days, add_to_date, flt, getdate
+from frappe.query_builder import Case, CustomFunction, DocType
+from frappe.query_builder.functions import Extract, IfNull, Min, Sum
+from frappe.utils import add_days, add_to_date, cint, flt, getdate
+from pypika.enums import DatePart
 
 from erpnext.accounts.utils import get_fiscal_year
 
+from vciplreports.utils.report_cache import cached_report
+from vciplreports.utils.report_profiler import add_rows_fetched, profile_stage, profiled_report
+from vciplreports.utils.tree_cache import get_supplier_group_map, get_tree_snapshot
+from vciplreports.vciplreports.doctype.daily_sales_cube.daily_sales_cube import CUBE_DOC_TYPES
+
+# MariaDB YEARWEEK() in mode 3 is the ISO (year, week) pair, i.e. one Monday-Sunday range
+YearWeek = CustomFunction("YEARWEEK", ["date", "mode"])
+
+# threads (each with its own DB connection) used when subsidiaries are aggregated
+# in parallel; opt-in, see Analytics.use_company_shards()
+PARALLEL_COMPANY_WORKERS = 4
+
+# flat trees whose rows are listed in matrix order, i.e. ordered by the entity's name
+ENTITY_DOCTYPES = ["Supplier", "Item", "Project"]
+
+
+class PeriodMatrix:
+    """
+    Entity x period amounts stored row-major in one flat ``array('d')``.
+
+    Rows are allocated on first touch and addressed through ``index``
+    (entity -> row number), which also preserves first-seen entity order.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self.index = {}
+        self.values = array("d")
+        self.zeros = array("d", [0.0]) * width
+
+    def __contains__(self, entity):
+        return entity in self.index
+
+    def __iter__(self):
+        return iter(self.index)
 
+    def offset(self, entity):
+        row = self.index.get(entity)
+        if row is None:
+            row = self.index[entity] = len(self.index)
+            self.values.extend(self.zeros)
+        return row * self.width
+
+    def add(self, entity, period_idx, value):
+        self.values[self.offset(entity) + period_idx] += value
+
+    def add_row(self, entity, amounts):
+        start = self.offset(entity)
+        values = self.values
+        for i, amount in enumerate(amounts):
+            values[start + i] += amount
+
+    def get(self, entity):
+        row = self.index.get(entity)
+        if row is None:
+            return self.zeros
+        start = row * self.width
+        return self.values[start : start + self.width]
+
+
+@profiled_report("Sales Analytic Report")
+@cached_report("Sales Analytic Report")
 def execute(filters=None):
     return Analytics(filters).run()
 
@@ -57,16 +122,40 @@ class Analytics:
         self.filters["company"] = company_list
 
     def run(self):
-        self.update_company_list_for_parent_company()
-        self.get_columns()
+        with profile_stage("period index"):
+            self.update_company_list_for_parent_company()
+            self.build_period_index()
+            self.get_columns()
+
+        # stages for the data are recorded inside iter_data()
         self.get_data()
-        self.get_chart_data()
+
+        with profile_stage("chart"):
+            self.get_chart_data()
 
         # Show total row at the bottom (user requested final total)
         skip_total_row = 0
 
         return self.columns, self.data, None, self.chart, None, skip_total_row
 
+    def iter_export_rows(self):
+        """
+        Header row, then one list of cell values per report row, produced lazily
+        so exports never hold the full `self.data` in memory.
+        """
+        self.update_company_list_for_parent_company()
+        self.build_period_index()
+        self.get_columns()
+
+        fieldnames = [c["fieldname"] for c in self.columns]
+        yield [c["label"] for c in self.columns]
+
+        for row in self.iter_data():
+            values = [row.get(fieldname) for fieldname in fieldnames]
+            # keep the tree shape visible in flat files
+            values[0] = "    " * (row.get("indent") or 0) + str(values[0] or "")
+            yield values
+
     # ----------------------------------------------------------------------
     # COLUMN SETUP
     # ----------------------------------------------------------------------
@@ -104,10 +193,9 @@ class Analytics:
                 }
             )
 
-        for end_date in self.periodic_daterange:
-            period = self.get_period(end_date)
+        for period, fieldname in zip(self.period_labels, self.period_fieldnames, strict=True):
             self.columns.append(
-                {"label": _(period), "fieldname": scrub(period), "fieldtype": "Float", "width": 120}
+                {"label": _(period), "fieldname": fieldname, "fieldtype": "Float", "width": 120}
             )
 
         self.columns.append({"label": _("Total"), "fieldname": "total", "fieldtype": "Float", "width": 120})
@@ -117,33 +205,158 @@ class Analytics:
     # ----------------------------------------------------------------------
 
     def get_data(self):
-        if self.filters.tree_type in ["Customer", "Supplier"]:
-            # Customer: supports custom_sub_group via Customer doctypes
-            self.get_sales_transactions_based_on_customers_or_suppliers()
-            self.get_rows_for_customer_or_supplier()
+        self.data = list(self.iter_data())
+
+    def iter_data(self):
+        """Fetch transactions for the tree type, then yield output rows one by one."""
+        if self.filters.tree_type == "Order Type" and self.filters.doc_type != "Sales Order":
+            return
+
+        if self.use_company_shards():
+            # consolidated group company: one shard per company, merged below
+            with profile_stage("company shards"):
+                self.merge_company_shards(self.run_company_shards())
+        else:
+            # when streaming, rows are read from the cursor during "periodic data"
+            with profile_stage("fetch"):
+                self.get_transactions()
+            with profile_stage("periodic data"):
+                self.get_periodic_data()
+
+        with profile_stage("tree structure"):
+            self.get_tree_structure()
+
+        with profile_stage("rows"):
+            if self.filters.tree_type in ["Customer", "Supplier"]:
+                # Customer: supports custom_sub_group via Customer doctypes
+                yield from self.get_rows_for_customer_or_supplier()
+
+            elif self.filters.tree_type in ["Item", "Project"]:
+                yield from self.get_rows()
+
+            elif self.filters.tree_type in ["Customer Group", "Supplier Group", "Territory", "Item Group", "Order Type"]:
+                yield from self.get_rows_by_group()
+
+    def get_transactions(self):
+        """
+        Run the aggregated transaction query for the tree type. `self.entries`
+        becomes an iterable of `(entity, date, value[, extra])` tuples that
+        `get_periodic_data()` consumes exactly once.
+        """
+        self.entries = []
+        self.row_stream = None
 
+        if self.use_sales_cube():
+            self.get_transactions_from_cube()
+        elif self.filters.tree_type in ["Customer", "Supplier"]:
+            self.get_sales_transactions_based_on_customers_or_suppliers()
         elif self.filters.tree_type == "Item":
             self.get_sales_transactions_based_on_items()
-            self.get_rows()
-
         elif self.filters.tree_type in ["Customer Group", "Supplier Group", "Territory"]:
             self.get_sales_transactions_based_on_customer_or_territory_group()
-            self.get_rows_by_group()
-
         elif self.filters.tree_type == "Item Group":
             self.get_sales_transactions_based_on_item_group()
-            self.get_rows_by_group()
-
         elif self.filters.tree_type == "Order Type":
-            if self.filters.doc_type != "Sales Order":
-                self.data = []
-                return
             self.get_sales_transactions_based_on_order_type()
-            self.get_rows_by_group()
-
         elif self.filters.tree_type == "Project":
             self.get_sales_transactions_based_on_project()
-            self.get_rows()
+
+    def get_tree_structure(self):
+        """Row order / hierarchy, loaded once the periodic amounts are known."""
+        if self.filters.tree_type == "Customer":
+            # Ordered customer list (for stable output)
+            self.customer_list = frappe.db.get_all(
+                "Customer",
+                filters={"name": ["in", list(self.entity_names.keys())]},
+                fields=["name", "customer_name"],
+                order_by="name",
+            )
+        elif self.filters.tree_type in ["Customer Group", "Supplier Group", "Territory", "Item Group"]:
+            self.get_groups()
+        elif self.filters.tree_type == "Order Type":
+            self.get_teams()
+
+    # ----------------------------------------------------------------------
+    # PER-COMPANY SHARDS
+    # ----------------------------------------------------------------------
+
+    def use_company_shards(self):
+        """Aggregate each company of a consolidated run on its own thread (opt-in)."""
+        enabled = self.filters.get(
+            "parallel_companies", frappe.conf.get("vciplreports_parallel_company_shards")
+        )
+        return cint(enabled) and len(self.filters.company) > 1 and PARALLEL_COMPANY_WORKERS > 1
+
+    def run_company_shards(self):
+        """
+        Fetch and bucket each company on its own connection in a thread pool.
+        Shards reuse this run's period index so their matrices line up column
+        for column; results come back in company order.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        context = frappe._dict(
+            site=frappe.local.site,
+            sites_path=frappe.local.sites_path,
+            user=frappe.session.user,
+            period_labels=self.period_labels,
+            period_fieldnames=self.period_fieldnames,
+        )
+        shard_filters = [
+            frappe._dict(self.filters, company=[company]) for company in self.filters.company
+        ]
+
+        workers = min(PARALLEL_COMPANY_WORKERS, len(shard_filters))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda filters: run_company_shard(context, filters), shard_filters))
+
+    def merge_company_shards(self, shards):
+        """
+        Add the partial period matrices together. Flat trees list entities in
+        the order a single GROUP BY query returns them, i.e. sorted by entity
+        under the database collation.
+        """
+        self.entity_periodic_data = PeriodMatrix(len(self.period_labels))
+        self.entity_names, self.entity_uoms, self.customer_labels = {}, {}, {}
+        self.sub_group_map, self.customer_map = {}, {}
+
+        entities = {}
+        for shard in shards:
+            entities.update(dict.fromkeys(shard.entity_periodic_data))
+
+        for entity in self.get_entity_order(list(entities)):
+            for shard in shards:
+                if entity in shard.entity_periodic_data:
+                    self.entity_periodic_data.add_row(entity, shard.entity_periodic_data.get(entity))
+
+        for shard in shards:
+            for name in ("entity_names", "entity_uoms", "customer_labels"):
+                merged = getattr(self, name)
+                for key, value in (shard.get(name) or {}).items():
+                    merged.setdefault(key, value)
+
+            for name in ("sub_group_map", "customer_map"):
+                merged = getattr(self, name)
+                for key, members in (shard.get(name) or {}).items():
+                    merged.setdefault(key, set()).update(members)
+
+    def get_entity_order(self, entities):
+        """
+        `entities` in the order the database sorts their names. Only flat trees
+        list rows in matrix order; the others follow the group tree.
+        """
+        if self.filters.tree_type not in ENTITY_DOCTYPES or not entities:
+            return entities
+
+        ordered = frappe.get_all(
+            self.filters.tree_type,
+            filters={"name": ["in", entities]},
+            pluck="name",
+            order_by="name asc",
+        )
+        # entities deleted since they were transacted keep their shard order, last
+        known = set(ordered)
+        return ordered + [entity for entity in entities if entity not in known]
 
     # ----------------------------------------------------------------------
     # ORIGINAL / BASE QUERIES
@@ -157,23 +370,21 @@ class Analytics:
 
         doctype = DocType(self.filters.doc_type)
 
-        self.entries = (
-            frappe.qb.from_(doctype)
-            .select(
-                doctype.order_type.as_("entity"),
+        self.entries = self.fetch_rows(
+            self.aggregate_by_period(
+                frappe.qb.from_(doctype)
+                .where(
+                    (doctype.docstatus == 1)
+                    & (doctype.company.isin(self.filters.company))
+                    & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+                    & (IfNull(doctype.order_type, "") != "")
+                )
+                .orderby(doctype.order_type),
                 doctype[self.date_field],
-                doctype[value_field].as_("value_field"),
-            )
-            .where(
-                (doctype.docstatus == 1)
-                & (doctype.company.isin(self.filters.company))
-                & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
-                & (IfNull(doctype.order_type, "") != "")
+                doctype[value_field],
+                doctype.order_type.as_("entity"),
             )
-            .orderby(doctype.order_type)
-        ).run(as_dict=True)
-
-        self.get_teams()
+        )
 
     def get_sales_transactions_based_on_customers_or_suppliers(self):
         """
@@ -188,27 +399,19 @@ class Analytics:
 
         # Supplier path (unchanged)
         if self.filters.tree_type == "Supplier":
-            entity = "supplier as entity"
-            entity_name = "supplier_name as entity_name"
-            filters = {
-                "docstatus": 1,
-                "company": ["in", self.filters.company],
-                self.date_field: ("between", [self.filters.from_date, self.filters.to_date]),
-            }
-            if self.filters.doc_type in ["Sales Invoice", "Purchase Invoice", "Payment Entry"]:
-                filters.update({"is_opening": "No"})
+            doctype = DocType(self.filters.doc_type)
 
-            self.entries = frappe.get_all(
-                self.filters.doc_type,
-                fields=[entity, entity_name, f"{value_field} as value_field", self.date_field],
-                filters=filters,
+            rows = self.fetch_rows(
+                self.aggregate_by_period(
+                    frappe.qb.from_(doctype).where(self.get_document_conditions(doctype)),
+                    doctype[self.date_field],
+                    doctype[value_field],
+                    doctype.supplier.as_("entity"),
+                    doctype.supplier_name.as_("entity_name"),
+                )
             )
 
-            # entity name map
-            self.entity_names = {}
-            for d in self.entries:
-                self.entity_names.setdefault(d.entity, d.get("entity_name"))
-
+            self.set_entity_names(rows)
             return
 
         # Customer path (tree_type == "Customer")
@@ -221,59 +424,49 @@ class Analytics:
             doctype = DocType(self.filters.doc_type)
             customer = DocType("Customer")
 
-            entries = (
-                frappe.qb.from_(doctype)
-                .join(customer)
-                .on(doctype.customer == customer.name)
-                .select(
+            rows = self.fetch_rows(
+                self.aggregate_by_period(
+                    frappe.qb.from_(doctype)
+                    .join(customer)
+                    .on(doctype.customer == customer.name)
+                    .where(
+                        (doctype.docstatus == 1)
+                        & (doctype.company.isin(self.filters.company))
+                        & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+                    ),
+                    doctype[self.date_field],
+                    doctype[value_field_doc],
                     doctype.customer.as_("customer"),
                     customer.customer_name.as_("customer_name"),
                     customer.custom_sub_group.as_("custom_sub_group"),
-                    doctype[value_field_doc].as_("value_field"),
-                    doctype[self.date_field],
-                )
-                .where(
-                    (doctype.docstatus == 1)
-                    & (doctype.company.isin(self.filters.company))
-                    & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
                 )
-            ).run(as_dict=True)
+            )
 
-            self.entries = []
-            self.sub_group_map = {}
-            self.entity_names = {}
+            self.set_customer_entries(rows)
+            return
 
-            for e in entries:
-                cust = e.get("customer") or ""
-                cname = e.get("customer_name") or ""
-                sg = e.get("custom_sub_group") or None
+    def set_customer_entries(self, rows):
+        """Customer tree: one node per customer, or per customer sub group."""
+        self.sub_group_map = {}
+        self.entity_names = {}
+        self.entries = self.iter_customer_entries(rows)
 
-                # save customer display name
-                if cust:
-                    self.entity_names.setdefault(cust, cname)
+    def iter_customer_entries(self, rows):
+        # rows: (customer, customer_name, custom_sub_group, date, value)
+        for cust, cname, sg, posting_date, value in rows:
+            cust = cust or ""
 
-                if sg:
-                    node = f"{cust}::SUB::{sg}"
-                    self.sub_group_map.setdefault(cust, set()).add(sg)
-                else:
-                    node = cust
-
-                self.entries.append(
-                    {
-                        "entity": node,
-                        "value_field": e.get("value_field") or 0.0,
-                        self.date_field: e.get(self.date_field),
-                    }
-                )
+            # save customer display name
+            if cust:
+                self.entity_names.setdefault(cust, cname or "")
 
-            # Ordered customer list (for stable output)
-            self.customer_list = frappe.db.get_all(
-                "Customer",
-                filters={"name": ["in", list(self.entity_names.keys())]},
-                fields=["name", "customer_name"],
-                order_by="name",
-            )
-            return
+            if sg:
+                node = f"{cust}::SUB::{sg}"
+                self.sub_group_map.setdefault(cust, set()).add(sg)
+            else:
+                node = cust
+
+            yield node, posting_date, value
 
     def get_sales_transactions_based_on_items(self):
         if self.filters["value_quantity"] == "Value":
@@ -284,27 +477,36 @@ class Analytics:
         doctype = DocType(self.filters.doc_type)
         doctype_item = DocType(f"{self.filters.doc_type} Item")
 
-        self.entries = (
-            frappe.qb.from_(doctype_item)
-            .join(doctype)
-            .on(doctype.name == doctype_item.parent)
-            .select(
+        rows = self.fetch_rows(
+            self.aggregate_by_period(
+                frappe.qb.from_(doctype_item)
+                .join(doctype)
+                .on(doctype.name == doctype_item.parent)
+                .where(
+                    (doctype_item.docstatus == 1)
+                    & (doctype.company.isin(self.filters.company))
+                    & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+                ),
+                doctype[self.date_field],
+                doctype_item[value_field],
                 doctype_item.item_code.as_("entity"),
                 doctype_item.item_name.as_("entity_name"),
                 doctype_item.stock_uom,
-                doctype_item[value_field].as_("value_field"),
-                doctype[self.date_field],
             )
-            .where(
-                (doctype_item.docstatus == 1)
-                & (doctype.company.isin(self.filters.company))
-                & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
-            )
-        ).run(as_dict=True)
+        )
+
+        self.set_entity_names(rows)
 
+    def set_entity_names(self, rows):
+        # entity name map, filled while the rows are consumed
         self.entity_names = {}
-        for d in self.entries:
-            self.entity_names.setdefault(d.entity, d.entity_name)
+        self.entries = self.iter_named_entries(rows)
+
+    def iter_named_entries(self, rows):
+        # rows: (entity, entity_name[, stock_uom], date, value)
+        for entity, entity_name, *extra, posting_date, value in rows:
+            self.entity_names.setdefault(entity, entity_name)
+            yield entity, posting_date, value, *extra
 
     # ----------------------------------------------------------------------
     # CUSTOMER GROUP / TERRITORY / SUPPLIER GROUP LOGIC
@@ -330,90 +532,78 @@ class Analytics:
             doctype = DocType(self.filters.doc_type)
             customer = DocType("Customer")
 
-            entries = (
-                frappe.qb.from_(doctype)
-                .join(customer)
-                .on(doctype.customer == customer.name)
-                .select(
+            rows = self.fetch_rows(
+                self.aggregate_by_period(
+                    frappe.qb.from_(doctype)
+                    .join(customer)
+                    .on(doctype.customer == customer.name)
+                    .where(
+                        (doctype.docstatus == 1)
+                        & (doctype.company.isin(self.filters.company))
+                        & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+                    ),
+                    doctype[self.date_field],
+                    doctype[value_field_expr],
                     customer.customer_group.as_("entity_group"),
                     customer.custom_sub_group.as_("custom_sub_group"),
                     customer.name.as_("customer"),
                     customer.customer_name.as_("customer_name"),
-                    doctype[value_field_expr].as_("value_field"),
-                    doctype[self.date_field],
-                )
-                .where(
-                    (doctype.docstatus == 1)
-                    & (doctype.company.isin(self.filters.company))
-                    & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
-                )
-            ).run(as_dict=True)
-
-            # normalised structures
-            self.entries = []
-            self.sub_group_map = {}
-            self.customer_map = {}      # key: subgroup node, value: set(customer)
-            self.customer_labels = {}   # key: customer, value: "CUST-001 - Name"
-
-            for e in entries:
-                grp = e.get("entity_group") or ""
-                sg = e.get("custom_sub_group") or None
-                cust = e.get("customer")
-                cname = e.get("customer_name") or ""
-
-                # determine node (group or group::SUB::subgroup)
-                if sg:
-                    node = f"{grp}::SUB::{sg}"
-                    self.sub_group_map.setdefault(grp, set()).add(sg)
-                else:
-                    node = grp
-
-                # store row
-                self.entries.append(
-                    {
-                        "entity": node,
-                        "customer": cust,
-                        "customer_name": cname,
-                        self.date_field: e.get(self.date_field),
-                        "value_field": e.get("value_field") or 0.0,
-                    }
                 )
+            )
 
-                # customer per subgroup node
-                if cust:
-                    self.customer_map.setdefault(node, set()).add(cust)
-                    # label: CUST-001 – Alfa Traders Pvt Ltd
-                    label = cust
-                    if cname:
-                        label = f"{cust} - {cname}"
-                    self.customer_labels[cust] = label
-
-            # load all groups / depth_map
-            self.get_groups()
+            self.set_customer_group_entries(rows)
             return
 
         # ---------------- OTHER TREE TYPES (original behaviour) ---------------
+        doctype = DocType(self.filters.doc_type)
+
         if self.filters.tree_type == "Supplier Group":
-            entity_field = "supplier as entity"
+            entity_field = doctype.supplier.as_("entity")
             self.get_supplier_parent_child_map()
         else:
-            entity_field = "territory as entity"
+            entity_field = doctype.territory.as_("entity")
 
-        filters = {
-            "docstatus": 1,
-            "company": ["in", self.filters.company],
-            self.date_field: ("between", [self.filters.from_date, self.filters.to_date]),
-        }
+        self.entries = self.fetch_rows(
+            self.aggregate_by_period(
+                frappe.qb.from_(doctype).where(self.get_document_conditions(doctype)),
+                doctype[self.date_field],
+                doctype[value_field_expr],
+                entity_field,
+            )
+        )
 
-        if self.filters.doc_type in ["Sales Invoice", "Purchase Invoice", "Payment Entry"]:
-            filters.update({"is_opening": "No"})
+    def set_customer_group_entries(self, rows):
+        """Customer Group tree: group (or group::SUB::subgroup) nodes plus their customers."""
+        # normalised structures
+        self.sub_group_map = {}
+        self.customer_map = {}      # key: subgroup node, value: set(customer)
+        self.customer_labels = {}   # key: customer, value: "CUST-001 - Name"
+        self.entries = self.iter_customer_group_entries(rows)
+
+    def iter_customer_group_entries(self, rows):
+        # rows: (customer_group, custom_sub_group, customer, customer_name, date, value)
+        for grp, sg, cust, cname, posting_date, value in rows:
+            grp = grp or ""
+            cname = cname or ""
+
+            # determine node (group or group::SUB::subgroup)
+            if sg:
+                node = f"{grp}::SUB::{sg}"
+                self.sub_group_map.setdefault(grp, set()).add(sg)
+            else:
+                node = grp
 
-        self.entries = frappe.get_all(
-            self.filters.doc_type,
-            fields=[entity_field, f"{value_field_expr} as value_field", self.date_field],
-            filters=filters,
-        )
-        self.get_groups()
+            # customer per subgroup node
+            if cust:
+                self.customer_map.setdefault(node, set()).add(cust)
+                # label: CUST-001 – Alfa Traders Pvt Ltd
+                label = cust
+                if cname:
+                    label = f"{cust} - {cname}"
+                self.customer_labels[cust] = label
+
+            # the customer rides along for its own 3rd level totals
+            yield node, posting_date, value, cust
 
     def get_sales_transactions_based_on_item_group(self):
         if self.filters["value_quantity"] == "Value":
@@ -424,46 +614,212 @@ class Analytics:
         doctype = DocType(self.filters.doc_type)
         doctype_item = DocType(f"{self.filters.doc_type} Item")
 
-        self.entries = (
-            frappe.qb.from_(doctype_item)
-            .join(doctype)
-            .on(doctype.name == doctype_item.parent)
-            .select(
-                doctype_item.item_group.as_("entity"),
-                doctype_item[value_field].as_("value_field"),
+        self.entries = self.fetch_rows(
+            self.aggregate_by_period(
+                frappe.qb.from_(doctype_item)
+                .join(doctype)
+                .on(doctype.name == doctype_item.parent)
+                .where(
+                    (doctype_item.docstatus == 1)
+                    & (doctype.company.isin(self.filters.company))
+                    & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+                ),
                 doctype[self.date_field],
+                doctype_item[value_field],
+                doctype_item.item_group.as_("entity"),
             )
-            .where(
-                (doctype_item.docstatus == 1)
-                & (doctype.company.isin(self.filters.company))
-                & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+        )
+
+    def get_sales_transactions_based_on_project(self):
+        if self.filters["value_quantity"] == "Value":
+            value_field = "base_net_total"
+        else:
+            value_field = "total_qty"
+
+        doctype = DocType(self.filters.doc_type)
+
+        self.entries = self.fetch_rows(
+            self.aggregate_by_period(
+                frappe.qb.from_(doctype).where(
+                    self.get_document_conditions(doctype) & (IfNull(doctype.project, "") != "")
+                ),
+                doctype[self.date_field],
+                doctype[value_field],
+                doctype.project.as_("entity"),
             )
-        ).run(as_dict=True)
+        )
+
+    # ----------------------------------------------------------------------
+    # DAILY SALES CUBE
+    # ----------------------------------------------------------------------
 
-        self.get_groups()
+    def use_sales_cube(self):
+        """Read pre-aggregated day rows instead of transaction lines (opt-in, needs a backfill)."""
+        enabled = self.filters.get("use_sales_cube", frappe.conf.get("vciplreports_use_sales_cube"))
+        return enabled and self.filters.doc_type in CUBE_DOC_TYPES
+
+    def get_transactions_from_cube(self):
+        """
+        Same rows as the transaction queries, aggregated from `tabDaily Sales Cube`.
+        Cube rows are item level, so header totals are the sums of item amounts.
+        """
+        tree_type = self.filters.tree_type
+        cube = DocType("Daily Sales Cube")
 
-    def get_sales_transactions_based_on_project(self):
         if self.filters["value_quantity"] == "Value":
-            value_field = "base_net_total as value_field"
+            value_column = cube.value
+        elif tree_type == "Item":
+            value_column = cube.stock_qty
         else:
-            value_field = "total_qty as value_field"
+            value_column = cube.qty
 
-        entity = "project as entity"
+        conditions = (
+            (cube.doc_type == self.filters.doc_type)
+            & (cube.company.isin(self.filters.company))
+            & (cube.posting_date.between(self.filters.from_date, self.filters.to_date))
+        )
+        # the transaction queries only exclude opening entries on these paths
+        if tree_type in ["Supplier", "Supplier Group", "Territory", "Project"]:
+            conditions &= cube.is_opening == 0
 
-        filters = {
-            "docstatus": 1,
-            "company": ["in", self.filters.company],
-            "project": ["!=", ""],
-            self.date_field: ("between", [self.filters.from_date, self.filters.to_date]),
-        }
+        query = frappe.qb.from_(cube)
+
+        if tree_type in ["Customer", "Customer Group"]:
+            customer = DocType("Customer")
+            query = query.join(customer).on(cube.customer == customer.name)
+            # same column order as the transaction queries of these tree types
+            if tree_type == "Customer Group":
+                columns = [
+                    cube.customer_group.as_("entity_group"),
+                    cube.custom_sub_group.as_("custom_sub_group"),
+                    cube.customer.as_("customer"),
+                    customer.customer_name.as_("customer_name"),
+                ]
+            else:
+                columns = [
+                    cube.customer.as_("customer"),
+                    customer.customer_name.as_("customer_name"),
+                    cube.custom_sub_group.as_("custom_sub_group"),
+                ]
+
+        elif tree_type == "Supplier":
+            supplier = DocType("Supplier")
+            query = query.left_join(supplier).on(cube.supplier == supplier.name)
+            columns = [cube.supplier.as_("entity"), supplier.supplier_name.as_("entity_name")]
+
+        elif tree_type == "Item":
+            item = DocType("Item")
+            query = query.left_join(item).on(cube.item_code == item.name)
+            columns = [cube.item_code.as_("entity"), item.item_name.as_("entity_name"), item.stock_uom]
+
+        elif tree_type == "Supplier Group":
+            self.get_supplier_parent_child_map()
+            columns = [cube.supplier.as_("entity")]
+
+        elif tree_type == "Order Type":
+            conditions &= IfNull(cube.order_type, "") != ""
+            columns = [cube.order_type.as_("entity")]
+
+        elif tree_type == "Project":
+            conditions &= IfNull(cube.project, "") != ""
+            columns = [cube.project.as_("entity")]
+
+        else:
+            # Territory / Item Group
+            columns = [cube[scrub(tree_type)].as_("entity")]
+
+        rows = self.fetch_rows(
+            self.aggregate_by_period(query.where(conditions), cube.posting_date, value_column, *columns)
+        )
+
+        if tree_type == "Customer":
+            self.set_customer_entries(rows)
+        elif tree_type == "Customer Group":
+            self.set_customer_group_entries(rows)
+        elif tree_type in ["Supplier", "Item"]:
+            self.set_entity_names(rows)
+        else:
+            self.entries = rows
+
+    # ----------------------------------------------------------------------
+    # SQL AGGREGATION HELPERS
+    # ----------------------------------------------------------------------
+
+    def get_document_conditions(self, doctype):
+        """Standard submitted / company / date-range conditions on the parent doctype."""
+        conditions = (
+            (doctype.docstatus == 1)
+            & (doctype.company.isin(self.filters.company))
+            & (doctype[self.date_field].between(self.filters.from_date, self.filters.to_date))
+        )
 
         if self.filters.doc_type in ["Sales Invoice", "Purchase Invoice", "Payment Entry"]:
-            filters.update({"is_opening": "No"})
+            conditions &= doctype.is_opening == "No"
+
+        return conditions
+
+    def aggregate_by_period(self, query, date_column, value_column, *entity_columns):
+        """
+        Group `query` by the entity columns and the period bucket of `date_column`.
 
-        self.entries = frappe.get_all(
-            self.filters.doc_type, fields=[entity, value_field, self.date_field], filters=filters
+        Rows are `(*entity_columns, date, value)`: SUM(value) and the earliest date
+        of the bucket, so `get_period_index()` maps the row to the same period the
+        individual transaction rows would have fallen into.
+        """
+        return (
+            query.select(
+                *entity_columns,
+                Min(date_column).as_(self.date_field),
+                Sum(value_column).as_("value_field"),
+            )
+            .groupby(*entity_columns, *self.get_period_bucket(date_column))
         )
 
+    def use_streaming_fetch(self):
+        """Read result rows off an unbuffered cursor (opt-in, per run or in site config)."""
+        return cint(self.filters.get("stream_fetch", frappe.conf.get("vciplreports_stream_analytics_fetch", 0)))
+
+    def fetch_rows(self, query):
+        """
+        Rows of `query` as plain tuples. When streaming, they are pulled from a
+        server-side cursor while `get_periodic_data()` consumes them, so the
+        result set is never held in memory as a whole.
+
+        While a stream is open its unbuffered cursor is frappe.db's cursor:
+        nothing may query the database until the rows are exhausted or
+        `close_entries()` has run. That includes lazy lookups such as
+        frappe.get_cached_value and hooks; any such call fails with
+        "Commands out of sync".
+        """
+        if not self.use_streaming_fetch():
+            return query.run()
+
+        self.row_stream = stream_rows(query)
+        return self.row_stream
+
+    def close_entries(self):
+        """Release the unbuffered cursor even when `self.entries` was not read to the end."""
+        for rows in (self.entries, getattr(self, "row_stream", None)):
+            close = getattr(rows, "close", None)
+            if close:
+                close()
+
+    def get_period_bucket(self, date_column):
+        """SQL expressions that identify the `periodic_daterange` bucket of `date_column`."""
+        # weeks start on Monday and months on the 1st, as the calendar ones do
+        if self.filters.range == "Weekly":
+            return [YearWeek(date_column, 3)]
+        elif self.filters.range == "Monthly":
+            return [Extract(DatePart.year, date_column), Extract(DatePart.month, date_column)]
+
+        # Quarterly (which starts in the from_date month, not on a calendar quarter)
+        # and Yearly: ranges are ordered, so the first end date not before the row wins
+        bucket = Case()
+        for idx, end_date in enumerate(self.periodic_daterange):
+            bucket = bucket.when(date_column <= end_date, idx)
+
+        return [bucket]
+
     # ----------------------------------------------------------------------
     # ROW BUILDING
     # ----------------------------------------------------------------------
@@ -472,9 +828,6 @@ class Analytics:
         """
         Handles Customer tree_type (with subgroups) and Supplier standard behaviour.
         """
-        self.get_periodic_data()
-        data = []
-
         # Customer tree: parent is Customer, child is its subgroups
         if self.filters.tree_type == "Customer":
             # iterate customers in deterministic order
@@ -491,109 +844,55 @@ class Analytics:
                 cname = c.get("customer_name")
 
                 # parent customer row
-                row = {"entity": cust, "entity_name": cname}
-                total = 0.0
-                for end_date in self.periodic_daterange:
-                    period = self.get_period(end_date)
-                    amount = flt(self.entity_periodic_data.get(cust, {}).get(period, 0.0))
-                    row[scrub(period)] = amount
-                    total += amount
-                row["total"] = total
-                data.append(row)
+                yield self.make_row(cust, entity_name=cname)
 
                 # subgroups
                 subgroups = sorted(list(self.sub_group_map.get(cust, []))) if hasattr(self, "sub_group_map") else []
                 for sg in subgroups:
                     node = f"{cust}::SUB::{sg}"
-                    row_sg = {"entity": node, "entity_name": None, "indent": 1}
-                    total_sg = 0.0
-                    for end_date in self.periodic_daterange:
-                        period = self.get_period(end_date)
-                        val = flt(self.entity_periodic_data.get(node, {}).get(period, 0.0))
-                        row_sg[scrub(period)] = val
-                        total_sg += val
-                    row_sg["total"] = total_sg
-                    data.append(row_sg)
-
-            self.data = data
+                    yield self.make_row(node, entity_name=None, indent=1)
+
             return
 
         # Supplier tree (simple list)
-        self.get_rows()
+        yield from self.get_rows()
 
     def get_rows(self):
-        self.data = []
-        self.get_periodic_data()
-
-        for entity, period_data in self.entity_periodic_data.items():
-            row = {
-                "entity": entity,
-                "entity_name": self.entity_names.get(entity) if hasattr(self, "entity_names") else None,
-            }
-            total = 0
-            for end_date in self.periodic_daterange:
-                period = self.get_period(end_date)
-                amount = flt(period_data.get(period, 0.0))
-                row[scrub(period)] = amount
-                total += amount
-
-            row["total"] = total
+        for entity in self.entity_periodic_data:
+            row = self.make_row(
+                entity,
+                entity_name=self.entity_names.get(entity) if hasattr(self, "entity_names") else None,
+            )
 
             if self.filters.tree_type == "Item":
-                row["stock_uom"] = period_data.get("stock_uom")
+                row["stock_uom"] = self.entity_uoms.get(entity)
 
-            self.data.append(row)
+            yield row
 
     def get_rows_by_group(self):
-        # Build periodic data first
-        self.get_periodic_data()
-
         # For Customer Group tree, roll up subgroup totals into parent groups
         if self.filters.tree_type == "Customer Group":
             self.rollup_subgroups_to_parent()
 
-        out = []
+        # parent totals must include children before any row is emitted
+        self.rollup_group_tree()
 
-        # IMPORTANT: iterate from leaves to root so that parent totals include children
-        for d in reversed(self.group_entries):
+        # group_entries is ordered by lft, i.e. parents come before their descendants
+        for d in self.group_entries:
             gname = d.name
-            block = []  # rows that belong to this group (group + subgroups + customers)
 
             # ---------------- GROUP ROW ----------------
-            row = {"entity": gname, "indent": self.depth_map.get(gname)}
-            total = 0.0
-            for end_date in self.periodic_daterange:
-                period = self.get_period(end_date)
-                amount = flt(self.entity_periodic_data.get(gname, {}).get(period, 0.0))
-                row[scrub(period)] = amount
-
-                # aggregate value into parent (original behaviour)
-                if d.parent and (self.filters.tree_type != "Order Type" or d.parent == "Order Types"):
-                    self.entity_periodic_data.setdefault(d.parent, frappe._dict()).setdefault(period, 0.0)
-                    self.entity_periodic_data[d.parent][period] += amount
-
-                total += amount
-
-            row["total"] = total
-            block.append(row)
+            yield self.make_row(gname, indent=self.depth_map.get(gname))
 
             # ---------------- CUSTOMER GROUP SPECIAL: SUBGROUP + CUSTOMER ROWS -------------
             if self.filters.tree_type == "Customer Group":
                 base_indent = (self.depth_map.get(gname) or 0)
 
-                # SUBGROUP rows (direct children of this group)
+                # SUBGROUP rows (listed right below their group, before child groups)
                 subgroups = sorted(list(self.sub_group_map.get(gname, []))) if hasattr(self, "sub_group_map") else []
                 for sg in subgroups:
                     node = f"{gname}::SUB::{sg}"
-                    row_sg = {"entity": node, "indent": base_indent + 1}
-                    total_sg = 0.0
-                    for end_date in self.periodic_daterange:
-                        period = self.get_period(end_date)
-                        val = flt(self.entity_periodic_data.get(node, {}).get(period, 0.0))
-                        row_sg[scrub(period)] = val
-                        total_sg += val
-                    row_sg["total"] = total_sg
-                    block.append(row_sg)
+                    yield self.make_row(node, indent=base_indent + 1)
 
                     # CUSTOMER rows under this subgroup
                     customers = (
@@ -602,61 +901,66 @@ class Analytics:
                         else []
                     )
                     for cust in customers:
-                        label = self.customer_labels.get(cust, cust)
-                        row_c = {
-                            "entity": label,  # "CUST-001 - Alfa Traders Pvt Ltd"
-                            "indent": base_indent + 2,
-                        }
-                        total_c = 0.0
-                        for end_date in self.periodic_daterange:
-                            period = self.get_period(end_date)
-                            v = flt(self.entity_periodic_data.get(cust, {}).get(period, 0.0))
-                            row_c[scrub(period)] = v
-                            total_c += v
-                        row_c["total"] = total_c
-                        block.append(row_c)
-
-            # prepend this block so that parent appears above all its descendants
-            out = block + out
-
-        self.data = out
+                        row_c = self.make_row(cust, indent=base_indent + 2)
+                        row_c["entity"] = self.customer_labels.get(cust, cust)  # "CUST-001 - Alfa Traders Pvt Ltd"
+                        yield row_c
 
     # ----------------------------------------------------------------------
     # PERIODIC DATA
     # ----------------------------------------------------------------------
 
+    def make_row(self, entity, amounts=None, **fields):
+        """Output row for `entity`: one column per period plus the row total."""
+        if amounts is None:
+            amounts = self.entity_periodic_data.get(entity)
+
+        row = {"entity": entity, **fields}
+        row.update(zip(self.period_fieldnames, amounts, strict=True))
+        row["total"] = sum(amounts)
+        return row
+
     def get_periodic_data(self):
-        self.entity_periodic_data = frappe._dict()
+        self.entity_periodic_data = PeriodMatrix(len(self.period_labels))
+        self.entity_uoms = {}
+
+        try:
+            self.add_entries_to_matrix()
+        finally:
+            self.close_entries()
 
-        for d in self.entries:
+    def add_entries_to_matrix(self):
+        tree_type = self.filters.tree_type
+
+        # extra: stock_uom for Item, customer for Customer Group
+        for entity, raw_date, value, *extra in self.entries:
             # Supplier Group mapping
-            if self.filters.tree_type == "Supplier Group":
-                d["entity"] = self.parent_child_map.get(d.get("entity"))
+            if tree_type == "Supplier Group":
+                entity = self.parent_child_map.get(entity)
 
-            entity = d.get("entity")
             if not entity:
                 continue
 
-            raw_date = d.get(self.date_field)
             if not raw_date:
                 continue
 
-            period = self.get_period(raw_date)
+            period_idx = self.get_period_index(raw_date)
+            if period_idx is None:
+                continue
+
+            value = flt(value or 0.0)
 
             # base entity (group / subgroup / item / customer / project etc.)
-            self.entity_periodic_data.setdefault(entity, frappe._dict()).setdefault(period, 0.0)
-            self.entity_periodic_data[entity][period] += flt(d.get("value_field") or 0.0)
+            self.entity_periodic_data.add(entity, period_idx, value)
 
             # ITEM extra data
-            if self.filters.tree_type == "Item":
-                self.entity_periodic_data[entity]["stock_uom"] = d.get("stock_uom")
+            if tree_type == "Item":
+                self.entity_uoms[entity] = extra[0]
 
             # CUSTOMER GROUP: maintain customer-level totals for 3rd level
-            if self.filters.tree_type == "Customer Group":
-                cust = d.get("customer")
+            if tree_type == "Customer Group":
+                cust = extra[0]
                 if cust:
-                    self.entity_periodic_data.setdefault(cust, frappe._dict()).setdefault(period, 0.0)
-                    self.entity_periodic_data[cust][period] += flt(d.get("value_field") or 0.0)
+                    self.entity_periodic_data.add(cust, period_idx, value)
 
     # ----------------------------------------------------------------------
     # PERIOD / DATE RANGE
@@ -676,85 +980,87 @@ class Analytics:
             period = str(year[0])
         return period
 
-    def get_period_date_ranges(self):
-        from dateutil.relativedelta import MO, relativedelta
-
-        from_date, to_date = getdate(self.filters.from_date), getdate(self.filters.to_date)
-
-        increment = {"Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}.get(self.filters.range, 1)
-
-        if self.filters.range in ["Monthly", "Quarterly"]:
-            from_date = from_date.replace(day=1)
-        elif self.filters.range == "Yearly":
-            from_date = get_fiscal_year(from_date)[1]
-        else:
-            from_date = from_date + relativedelta(from_date, weekday=MO(-1))
-
-        self.periodic_daterange = []
-        for _dummy in range(1, 53):
-            if self.filters.range == "Weekly":
-                period_end_date = add_days(from_date, 6)
-            else:
-                period_end_date = add_to_date(from_date, months=increment, days=-1)
+    def build_period_index(self):
+        """
+        Resolve the label of every period once. Rows are then bucketed by a
+        bisect over `periodic_daterange` (memoised per date), so the hot loops
+        never format labels or look up fiscal years.
+        """
+        self.period_labels = [self.get_period(end_date) for end_date in self.periodic_daterange]
+        self.period_fieldnames = [scrub(period) for period in self.period_labels]
+        self.period_index_by_date = {}
 
-            if period_end_date > to_date:
-                period_end_date = to_date
+    def get_period_index(self, posting_date):
+        idx = self.period_index_by_date.get(posting_date)
+        if idx is None:
+            idx = bisect_left(self.periodic_daterange, getdate(posting_date))
+            self.period_index_by_date[posting_date] = idx
 
-            self.periodic_daterange.append(period_end_date)
+        return idx if idx < len(self.periodic_daterange) else None
 
-            from_date = add_days(period_end_date, 1)
-            if period_end_date == to_date:
-                break
+    def get_period_date_ranges(self):
+        self.periodic_daterange = get_period_date_ranges(self.filters)
 
     # ----------------------------------------------------------------------
     # GROUP & TREE HELPERS
     # ----------------------------------------------------------------------
 
     def get_groups(self):
-        if self.filters.tree_type == "Territory":
-            parent = "parent_territory"
-        if self.filters.tree_type == "Customer Group":
-            parent = "parent_customer_group"
-        if self.filters.tree_type == "Item Group":
-            parent = "parent_item_group"
-        if self.filters.tree_type == "Supplier Group":
-            parent = "parent_supplier_group"
+        # shared snapshot, rebuilt only after the tree changes (see hooks.py doc_events)
+        snapshot = get_tree_snapshot(self.filters.tree_type)
 
+        self.group_entries = snapshot.nodes
+        self.depth_map = snapshot.depth_map
+
+    def get_teams(self):
         self.depth_map = frappe._dict()
 
-        self.group_entries = frappe.db.sql(
-            f"""select name, lft, rgt , {parent} as parent
-            from `tab{self.filters.tree_type}` order by lft""",
-            as_dict=1,
+        order_types = frappe.db.sql_list(
+            f"""select distinct order_type from `tab{self.filters.doc_type}`
+            where ifnull(order_type, '') != '' order by order_type"""
         )
 
+        # synthetic two-level nested set: "Order Types" root with one leaf per order type
+        self.group_entries = [
+            frappe._dict(name="Order Types", lft=0, rgt=2 * len(order_types) + 1, parent="")
+        ]
+        for idx, order_type in enumerate(order_types):
+            self.group_entries.append(
+                frappe._dict(name=order_type, lft=2 * idx + 1, rgt=2 * idx + 2, parent="Order Types")
+            )
+
         for d in self.group_entries:
             if d.parent:
                 self.depth_map.setdefault(d.name, self.depth_map.get(d.parent) + 1)
             else:
                 self.depth_map.setdefault(d.name, 0)
 
-    def get_teams(self):
-        self.depth_map = frappe._dict()
+    def get_supplier_parent_child_map(self):
+        self.parent_child_map = get_supplier_group_map()
 
-        self.group_entries = frappe.db.sql(
-            f""" select * from (select "Order Types" as name, 0 as lft,
-            2 as rgt, '' as parent union select distinct order_type as name, 1 as lft, 1 as rgt, "Order Types" as parent
-            from `tab{self.filters.doc_type}` where ifnull(order_type, '') != '') as b order by lft, name
-        """,
-            as_dict=1,
-        )
+    def rollup_group_tree(self):
+        """
+        Add every group's amounts into all of its ancestors in one pass.
+
+        Walks `group_entries` in lft order keeping the open ancestor chain on a
+        stack; a node is complete once a later node starts beyond its rgt, at
+        which point its subtree total is added to the ancestor below it.
+        """
+        matrix = self.entity_periodic_data
+        stack = []
+
+        def close_last():
+            node = stack.pop()
+            if stack:
+                matrix.add_row(stack[-1].name, matrix.get(node.name))
 
         for d in self.group_entries:
-            if d.parent:
-                self.depth_map.setdefault(d.name, self.depth_map.get(d.parent) + 1)
-            else:
-                self.depth_map.setdefault(d.name, 0)
+            while stack and d.lft > stack[-1].rgt:
+                close_last()
+            stack.append(d)
 
-    def get_supplier_parent_child_map(self):
-        self.parent_child_map = frappe._dict(
-            frappe.db.sql(""" select name, supplier_group from `tabSupplier`""")
-        )
+        while stack:
+            close_last()
 
     def rollup_subgroups_to_parent(self):
         """
@@ -765,16 +1071,9 @@ class Analytics:
             return
 
         for parent, sgs in self.sub_group_map.items():
-            self.entity_periodic_data.setdefault(parent, frappe._dict())
             for sg in sgs:
                 node = f"{parent}::SUB::{sg}"
-                for d in self.periodic_daterange:
-                    lbl = self.get_period(d)
-                    val = flt(self.entity_periodic_data.get(node, {}).get(lbl, 0.0))
-                    self.entity_periodic_data[parent].setdefault(lbl, 0.0)
-                    self.entity_periodic_data[parent][lbl] += val
-                    self.entity_periodic_data[parent].setdefault("total", 0.0)
-                    self.entity_periodic_data[parent]["total"] += val
+                self.entity_periodic_data.add_row(parent, self.entity_periodic_data.get(node))
 
     # ----------------------------------------------------------------------
     # CHART
@@ -795,3 +1094,198 @@ class Analytics:
             self.chart["fieldtype"] = "Currency"
         else:
             self.chart["fieldtype"] = "Float"
+
+
+def get_period_date_ranges(filters):
+    """
+    End date of every period between `filters.from_date` and `filters.to_date`,
+    in order. Periods start on the from_date month (Monthly / Quarterly), on the
+    fiscal year start (Yearly) or on the Monday of the from_date week (Weekly).
+    """
+    from dateutil.relativedelta import MO, relativedelta
+
+    from_date, to_date = getdate(filters.from_date), getdate(filters.to_date)
+
+    increment = {"Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}.get(filters.range, 1)
+
+    if filters.range in ["Monthly", "Quarterly"]:
+        from_date = from_date.replace(day=1)
+    elif filters.range == "Yearly":
+        from_date = get_fiscal_year(from_date)[1]
+    else:
+        from_date = from_date + relativedelta(from_date, weekday=MO(-1))
+
+    periodic_daterange = []
+    for _dummy in range(1, 53):
+        if filters.range == "Weekly":
+            period_end_date = add_days(from_date, 6)
+        else:
+            period_end_date = add_to_date(from_date, months=increment, days=-1)
+
+        if period_end_date > to_date:
+            period_end_date = to_date
+
+        periodic_daterange.append(period_end_date)
+
+        from_date = add_days(period_end_date, 1)
+        if period_end_date == to_date:
+            break
+
+    return periodic_daterange
+
+
+def stream_rows(query):
+    """Yield the rows of a query builder `query` from an unbuffered cursor."""
+    fetched = 0
+    try:
+        with frappe.db.unbuffered_cursor():
+            for row in query.run(as_iterator=True):
+                fetched += 1
+                yield row
+    finally:
+        # iterator results are not counted by the profiler's db.sql wrapper
+        add_rows_fetched(fetched)
+
+
+def run_company_shard(context, filters):
+    """Thread entry point: fetch and bucket one company's transactions."""
+    frappe.init(site=context.site, sites_path=context.sites_path)
+    frappe.connect()
+
+    try:
+        frappe.set_user(context.user)
+
+        shard = Analytics(filters)
+        shard.period_labels = context.period_labels
+        shard.period_fieldnames = context.period_fieldnames
+        shard.period_index_by_date = {}
+
+        shard.get_transactions()
+        shard.get_periodic_data()
+
+        return frappe._dict(
+            entity_periodic_data=shard.entity_periodic_data,
+            entity_names=getattr(shard, "entity_names", None),
+            entity_uoms=shard.entity_uoms,
+            sub_group_map=getattr(shard, "sub_group_map", None),
+            customer_map=getattr(shard, "customer_map", None),
+            customer_labels=getattr(shard, "customer_labels", None),
+        )
+    finally:
+        frappe.destroy()
+
+
+# ----------------------------------------------------------------------
+# PREPARED REPORT INVALIDATION
+# ----------------------------------------------------------------------
+
+
+def invalidate_prepared_reports(doc, method=None):
+    """
+    doc_events handler (on_submit / on_cancel of the supported doc types).
+
+    The report runs as a Prepared Report (background job, compressed stored
+    result served for identical filters). Drop every completed result whose
+    doc type and date range cover this document so the next open recomputes.
+    """
+    date_field = "transaction_date" if doc.doctype in ["Sales Order", "Purchase Order"] else "posting_date"
+    doc_date = getdate(doc.get(date_field))
+
+    for prepared_report in frappe.get_all(
+        "Prepared Report",
+        filters={"report_name": "Sales Analytic Report", "status": "Completed"},
+        fields=["name", "filters"],
+    ):
+        filters = frappe._dict(frappe.parse_json(prepared_report.filters or "{}"))
+
+        if filters.doc_type != doc.doctype:
+            continue
+
+        if (
+            filters.company
+            and not filters.show_aggregate_value_from_subsidiary_companies
+            and filters.company != doc.company
+        ):
+            continue
+
+        if filters.from_date and filters.to_date:
+            if not (getdate(filters.from_date) <= doc_date <= getdate(filters.to_date)):
+                continue
+
+        frappe.delete_doc(
+            "Prepared Report", prepared_report.name, ignore_permissions=True, delete_permanently=True
+        )
+
+
+# ----------------------------------------------------------------------
+# STREAMING EXPORT
+# ----------------------------------------------------------------------
+
+
+@frappe.whitelist()
+def export_report(filters, file_format="Excel"):
+    """Queue a streaming export; the file is attached to the user when ready."""
+    if not frappe.get_doc("Report", "Sales Analytic Report").is_permitted():
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
+    frappe.enqueue(
+        build_export,
+        queue="long",
+        timeout=3600,
+        filters=frappe.parse_json(filters),
+        file_format=file_format,
+        user=frappe.session.user,
+    )
+
+    return _("Export queued. You will be notified when the file is ready.")
+
+
+def build_export(filters, file_format, user):
+    frappe.set_user(user)
+
+    extension = "csv" if file_format == "CSV" else "xlsx"
+    file_name = f"sales-analytic-report-{frappe.generate_hash(length=10)}.{extension}"
+    file_path = frappe.get_site_path("private", "files", file_name)
+
+    rows = Analytics(filters).iter_export_rows()
+
+    if extension == "csv":
+        write_csv(file_path, rows)
+    else:
+        write_xlsx(file_path, rows)
+
+    file_doc = frappe.get_doc(
+        {
+            "doctype": "File",
+            "file_name": file_name,
+            "file_url": f"/private/files/{file_name}",
+            "is_private": 1,
+            "attached_to_doctype": "User",
+            "attached_to_name": user,
+        }
+    ).insert(ignore_permissions=True)
+
+    frappe.publish_realtime(
+        "sales_analytic_export_ready", {"file_url": file_doc.file_url}, user=user, after_commit=True
+    )
+
+
+def write_csv(file_path, rows):
+    import csv
+
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for row in rows:
+            writer.writerow(row)
+
+
+def write_xlsx(file_path, rows):
+    from openpyxl import Workbook
+
+    # write-only mode streams rows to a temp file instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sales Analytic Report")
+    for row in rows:
+        sheet.append(row)
+
+    workbook.save(file_path)
@@ -0,0 +1,156 @@
+# Copyright (c) 2026, AITS and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.query_builder import DocType
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from vciplreports.vciplreports.report.sales_analytic_report.sales_analytic_report import (
+	Analytics,
+	PeriodMatrix,
+)
+
+
+class TestSalesAnalyticReport(FrappeTestCase):
+	def get_analytics(self, **filters):
+		return Analytics(
+			{
+				"tree_type": "Customer",
+				"doc_type": "Sales Invoice",
+				"value_quantity": "Value",
+				"company": "_Test Company",
+				**filters,
+			}
+		)
+
+	def test_quarterly_periods_start_in_from_date_month(self):
+		analytics = self.get_analytics(range="Quarterly", from_date="2024-02-01", to_date="2024-12-31")
+
+		self.assertEqual(
+			analytics.periodic_daterange,
+			[getdate("2024-04-30"), getdate("2024-07-31"), getdate("2024-10-31"), getdate("2024-12-31")],
+		)
+
+	def test_quarterly_bucket_follows_period_ranges(self):
+		# Feb-Apr, May-Jul, ...: a calendar quarter bucket would start Q2 on 1 Apr and
+		# file its May / Jun amounts under Feb-Apr
+		analytics = self.get_analytics(range="Quarterly", from_date="2024-02-01", to_date="2024-12-31")
+		(bucket,) = analytics.get_period_bucket(DocType("Sales Invoice").posting_date)
+		sql = bucket.get_sql()
+
+		self.assertNotIn("QUARTER", sql.upper())
+		for end_date in analytics.periodic_daterange:
+			self.assertIn(str(end_date), sql)
+
+		analytics.period_index_by_date = {}
+		self.assertEqual(analytics.get_period_index(getdate("2024-04-01")), 0)
+		self.assertEqual(analytics.get_period_index(getdate("2024-05-01")), 1)
+		self.assertEqual(analytics.get_period_index(getdate("2024-06-15")), 1)
+		self.assertEqual(analytics.get_period_index(getdate("2024-08-01")), 2)
+
+	def test_monthly_bucket_is_calendar_month(self):
+		analytics = self.get_analytics(range="Monthly", from_date="2024-02-15", to_date="2024-05-31")
+		buckets = analytics.get_period_bucket(DocType("Sales Invoice").posting_date)
+
+		self.assertEqual(len(buckets), 2)
+		self.assertEqual(analytics.periodic_daterange[0], getdate("2024-02-29"))
+
+
+# All
+# ├── A (own amounts too)
+# │   ├── A1
+# │   └── A2
+# ├── B
+# │   └── B1
+# └── C (no amounts)
+TREE = [
+	("All", 1, 14, ""),
+	("A", 2, 7, "All"),
+	("A1", 3, 4, "A"),
+	("A2", 5, 6, "A"),
+	("B", 8, 11, "All"),
+	("B1", 9, 10, "B"),
+	("C", 12, 13, "All"),
+]
+AMOUNTS = {
+	"A": [1.0, 0.0, 2.0],
+	"A1": [10.0, 20.0, 30.0],
+	"A2": [0.5, 0.0, 4.5],
+	"B1": [100.0, 0.0, 300.0],
+}
+
+
+def baseline_rollup(group_entries, amounts, width):
+	"""The pre-matrix roll-up: walk leaves to root, adding each group into its parent."""
+	totals = {name: list(values) for name, values in amounts.items()}
+	for d in reversed(group_entries):
+		values = totals.setdefault(d.name, [0.0] * width)
+		if d.parent:
+			parent = totals.setdefault(d.parent, [0.0] * width)
+			for idx, value in enumerate(values):
+				parent[idx] += value
+
+	return totals
+
+
+class TestPeriodMatrixRollup(FrappeTestCase):
+	def setUp(self):
+		self.analytics = Analytics(
+			{
+				"tree_type": "Item Group",
+				"doc_type": "Sales Invoice",
+				"value_quantity": "Value",
+				"company": "_Test Company",
+				"range": "Monthly",
+				"from_date": "2024-01-01",
+				"to_date": "2024-03-31",
+			}
+		)
+		self.analytics.build_period_index()
+		self.width = len(self.analytics.period_labels)
+
+		self.analytics.group_entries = [
+			frappe._dict(name=name, lft=lft, rgt=rgt, parent=parent) for name, lft, rgt, parent in TREE
+		]
+		self.analytics.depth_map = {"All": 0, "A": 1, "A1": 2, "A2": 2, "B": 1, "B1": 2, "C": 1}
+
+		self.analytics.entity_periodic_data = PeriodMatrix(self.width)
+		for entity, values in AMOUNTS.items():
+			for idx, value in enumerate(values):
+				self.analytics.entity_periodic_data.add(entity, idx, value)
+
+	def test_period_matrix(self):
+		matrix = PeriodMatrix(3)
+		matrix.add("X", 1, 2.5)
+		matrix.add("Y", 0, 1.0)
+		matrix.add("X", 1, 0.5)
+		matrix.add_row("Y", [1.0, 2.0, 3.0])
+
+		self.assertEqual(list(matrix), ["X", "Y"])
+		self.assertEqual(list(matrix.get("X")), [0.0, 3.0, 0.0])
+		self.assertEqual(list(matrix.get("Y")), [2.0, 2.0, 3.0])
+		self.assertEqual(list(matrix.get("Z")), [0.0, 0.0, 0.0])
+		self.assertNotIn("Z", matrix)
+
+	def test_rollup_matches_parent_walk(self):
+		expected = baseline_rollup(self.analytics.group_entries, AMOUNTS, self.width)
+
+		self.analytics.rollup_group_tree()
+
+		for name, *_bounds in TREE:
+			self.assertEqual(list(self.analytics.entity_periodic_data.get(name)), expected[name], name)
+
+	def test_rows_match_baseline(self):
+		self.assertEqual(self.width, 3)
+		totals = baseline_rollup(self.analytics.group_entries, AMOUNTS, self.width)
+
+		expected = []
+		for d in self.analytics.group_entries:
+			row = {"entity": d.name, "indent": self.analytics.depth_map[d.name]}
+			row.update(zip(self.analytics.period_fieldnames, totals[d.name], strict=True))
+			row["total"] = sum(totals[d.name])
+			expected.append(row)
+
+		self.assertEqual(list(self.analytics.get_rows_by_group()), expected)
+		self.assertEqual(expected[0]["total"], 468.0)
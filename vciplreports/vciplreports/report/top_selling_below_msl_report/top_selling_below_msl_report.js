@@ -1,15 +1,72 @@
 frappe.query_reports["Top selling below MSL report"] = {
     onload: function(report) {
         report.set_filter_value("custom_item_type", "Finished Goods");   // default filter
+
+        // Keyset pagination: fetch the next Top-N items after the last row shown
+        report.page.add_inner_button(__("Load More"), function() {
+            const data = frappe.query_report.data || [];
+            const last = data[data.length - 1];
+            if (!last || !last.cursor) return;
+
+            frappe.call({
+                method: "vciplreports.vciplreports.report.top_selling_below_msl_report.top_selling_below_msl_report.get_next_page",
+                args: {
+                    filters: frappe.query_report.get_filter_values(),
+                    cursor: last.cursor
+                },
+                freeze: true,
+                callback: function(r) {
+                    const rows = r.message || [];
+                    if (!rows.length) {
+                        frappe.show_alert(__("No more items"));
+                        return;
+                    }
+                    data.push(...rows);
+                    frappe.query_report.datatable.refresh(data);
+                }
+            });
+        });
     },
 
     filters: [
+        {
+            fieldname: "company",
+            label: __("Company"),
+            fieldtype: "Link",
+            options: "Company",
+            default: frappe.defaults.get_user_default("Company")
+        },
+        {
+            fieldname: "item_group",
+            label: __("Item Group"),
+            fieldtype: "Link",
+            options: "Item Group"
+        },
+        {
+            fieldname: "warehouse",
+            label: __("Warehouse"),
+            fieldtype: "Link",
+            options: "Warehouse"
+        },
+        {
+            fieldname: "top_n",
+            label: __("Top N"),
+            fieldtype: "Int",
+            default: 200
+        },
         {
             fieldname: "custom_item_type",
             label: __("Item Type"),
             fieldtype: "Data",
             default: "Finished Goods",
             reqd: 0
+        },
+        {
+            fieldname: "stock_basis",
+            label: __("Stock Basis"),
+            fieldtype: "Select",
+            options: ["Actual Qty", "Projected Qty"],
+            default: "Actual Qty"
         }
     ],
 
@@ -36,30 +93,22 @@ $(document).on("click", ".show-warehouses", function(e) {
 
     const item_code = $(this).data("item");
 
-    frappe.call({
-        method: "frappe.client.get_list",
-        args: {
-            doctype: "Bin",
-            filters: { "item_code": item_code },
-            fields: ["warehouse", "actual_qty"]
-        },
-        callback: function(r) {
-            let rows = r.message || [];
+    // warehouse breakdown is already part of the report row
+    const item = (frappe.query_report.data || []).find(d => d.item_code === item_code);
+    const rows = (item && item.warehouses) || [];
 
-            let html = "<table class='table table-bordered'>";
-            html += "<tr><th>Warehouse</th><th>Stock Qty</th></tr>";
+    let html = "<table class='table table-bordered'>";
+    html += "<tr><th>Warehouse</th><th>Stock Qty</th></tr>";
 
-            rows.forEach(row => {
-                html += `<tr><td>${row.warehouse}</td><td>${row.actual_qty}</td></tr>`;
-            });
+    rows.forEach(([warehouse, qty]) => {
+        html += `<tr><td>${warehouse}</td><td>${qty}</td></tr>`;
+    });
 
-            html += "</table>";
+    html += "</table>";
 
-            frappe.msgprint({
-                title: "Warehouse Stock for: " + item_code,
-                message: html,
-                wide: true
-            });
-        }
+    frappe.msgprint({
+        title: "Warehouse Stock for: " + item_code,
+        message: html,
+        wide: true
     });
 });
@@ -1,11 +1,37 @@
-import frappe
 from datetime import date
+from decimal import Decimal
+
+import frappe
+from frappe.utils import add_days, cint
+
+from vciplreports.utils.report_cache import (
+    DEFAULT_TTL,
+    cached_report,
+    clear_if_stale,
+    evict,
+    get_cache_key,
+    touch,
+)
+from vciplreports.utils.report_profiler import profile_stage, profiled_report
+from vciplreports.utils.tree_cache import get_tree_bounds
 
+REPORT_NAME = "Top selling below MSL report"
 
+
+@profiled_report(REPORT_NAME)
+@cached_report(REPORT_NAME)
 def execute(filters=None):
-    filters = filters or {}
+    filters = frappe._dict(filters or {})
+    set_date_range(filters)
+
+    with profile_stage("sales and stock query"):
+        data = get_data(filters)
+
+    return get_columns(), data
 
-    # ---- FINANCIAL YEAR RANGE LOGIC ----
+
+# ---- FINANCIAL YEAR RANGE LOGIC ----
+def set_date_range(filters):
     year = int(filters.get("year")) if filters.get("year") else None
 
     if year:
@@ -22,8 +48,6 @@ def execute(filters=None):
     filters["from_date"] = from_date
     filters["to_date"] = to_date
 
-    return get_columns(), get_data(filters)
-
 
 # -------------------- COLUMNS -------------------- #
 def get_columns():
@@ -51,76 +75,146 @@ def get_columns():
 
 
 # -------------------- FETCH DATA -------------------- #
-def get_data(filters):
-
-    params = {
-        "docstatus": 1,
-        "from_date": filters["from_date"],
-        "to_date": filters["to_date"],
-    }
+WIP_WAREHOUSE = "Work In Progress - VCIPL"
 
-    # --------------------------------------
-    # SALES QUERY WITH SAFETY STOCK
-    # --------------------------------------
-    sales_query = """
-        SELECT
-            sii.item_code,
-            i.item_name,
-            i.item_group,
-            SUM(sii.amount) AS total_amount,
-            SUM(sii.qty) AS total_qty,
-            COALESCE(i.safety_stock, 0) AS min_stock_level
-        FROM `tabSales Invoice Item` sii
-        JOIN `tabSales Invoice` si ON si.name = sii.parent
-        JOIN `tabItem` i ON i.name = sii.item_code
-        WHERE 1 = 1
-            AND si.docstatus = %(docstatus)s
-            AND si.posting_date >= %(from_date)s
-            AND si.posting_date <= %(to_date)s
-        GROUP BY sii.item_code, i.item_name, i.item_group, i.safety_stock
-        ORDER BY total_amount DESC
-        LIMIT 200
-    """
+STOCK_BASIS_FIELDS = {
+    "Actual Qty": "actual_qty",
+    "Projected Qty": "projected_qty",
+}
 
-    rows = frappe.db.sql(sales_query, params, as_dict=True)
 
-    if not rows:
-        return []
+DEFAULT_TOP_N = 200
 
-    item_codes = [r.item_code for r in rows]
 
-    # --------------------------------------
-    # FETCH STOCK FROM BIN
-    # --------------------------------------
-    bins = frappe.get_all(
-        "Bin",
-        filters={"item_code": ["in", item_codes]},
-        fields=["item_code", "warehouse", "actual_qty"]
-    )
-
-    WIP_WAREHOUSE = "Work In Progress - VCIPL"
+def get_data(filters, cursor=None):
+    """
+    Top-N items by sales amount. `cursor` = [total_amount, item_code] of the
+    last row already shown; the next page starts right after it (keyset
+    pagination on total_amount DESC, item_code ASC) instead of using OFFSET.
 
-    total_stock = {}
-    warehouse_map = {}
+    The first page is one query. Later pages slice the ranked per-item totals
+    of the whole year (see `get_item_totals()`), which are aggregated once per
+    filter set rather than once per page.
+    """
 
-    for b in bins:
-        total_stock[b.item_code] = total_stock.get(b.item_code, 0) + b.actual_qty
-        warehouse_map.setdefault(b.item_code, {})
-        warehouse_map[b.item_code][b.warehouse] = b.actual_qty
+    # half-open range [from_date, to_date + 1) keeps posting_date sargable
+    params = {
+        "docstatus": 1,
+        "from_date": filters["from_date"],
+        "to_date_exclusive": add_days(filters["to_date"], 1),
+        "top_n": cint(filters.get("top_n")) or DEFAULT_TOP_N,
+    }
 
-    # ensure WIP warehouse exists even if qty = 0
-    for item in item_codes:
-        warehouse_map.setdefault(item, {})
-        warehouse_map[item].setdefault(WIP_WAREHOUSE, 0)
+    conditions = []
+    bin_conditions = []
+
+    if filters.get("company"):
+        conditions.append("si.company = %(company)s")
+        params["company"] = filters.company
+
+    if filters.get("custom_item_type"):
+        conditions.append("i.custom_item_type = %(custom_item_type)s")
+        params["custom_item_type"] = filters.custom_item_type
+
+    if filters.get("item_group"):
+        lft, rgt = get_tree_bounds("Item Group", filters.item_group)
+        conditions.append("""i.item_group IN (
+            SELECT name FROM `tabItem Group` WHERE lft >= %(ig_lft)s AND rgt <= %(ig_rgt)s)""")
+        params.update({"ig_lft": lft, "ig_rgt": rgt})
+
+    if filters.get("warehouse"):
+        lft, rgt = get_tree_bounds("Warehouse", filters.warehouse)
+        warehouses = """(
+            SELECT name FROM `tabWarehouse` WHERE lft >= %(wh_lft)s AND rgt <= %(wh_rgt)s)"""
+        conditions.append(f"sii.warehouse IN {warehouses}")
+        bin_conditions.append(f"b.warehouse IN {warehouses}")
+        params.update({"wh_lft": lft, "wh_rgt": rgt})
+
+    conditions = "".join(f"\n                AND {c}" for c in conditions)
+    bin_conditions = "".join(f" AND {c}" for c in bin_conditions)
+
+    # Actual stock, or projected stock (actual + ordered + planned - reserved)
+    stock_field = STOCK_BASIS_FIELDS.get(filters.get("stock_basis"), "actual_qty")
+
+    # per-item sales totals (with safety stock), ranked
+    sales_query = f"""
+            SELECT
+                sii.item_code,
+                i.item_name,
+                i.item_group,
+                SUM(sii.amount) AS total_amount,
+                SUM(sii.qty) AS total_qty,
+                COALESCE(i.safety_stock, 0) AS min_stock_level
+            FROM `tabSales Invoice Item` sii
+            JOIN `tabSales Invoice` si ON si.name = sii.parent
+            JOIN `tabItem` i ON i.name = sii.item_code
+            WHERE 1 = 1
+                AND si.docstatus = %(docstatus)s
+                AND si.posting_date >= %(from_date)s
+                AND si.posting_date < %(to_date_exclusive)s{conditions}
+            GROUP BY sii.item_code, i.item_name, i.item_group, i.safety_stock
+            ORDER BY total_amount DESC, sii.item_code"""
+
+    if cursor:
+        page = get_page_after(get_item_totals(filters, sales_query, params), cursor, params["top_n"])
+        sales_rows = get_page_stock(page, stock_field, bin_conditions, params)
+    else:
+        # --------------------------------------
+        # TOP SALES JOINED TO BIN IN ONE QUERY
+        # one result row per (item, warehouse)
+        # --------------------------------------
+        sales_rows = frappe.db.sql(
+            f"""
+            SELECT
+                s.item_code,
+                s.item_name,
+                s.item_group,
+                s.total_amount,
+                s.total_qty,
+                s.min_stock_level,
+                b.warehouse,
+                b.{stock_field} AS stock_qty
+            FROM ({sales_query}
+                LIMIT %(top_n)s
+            ) s
+            LEFT JOIN `tabBin` b ON b.item_code = s.item_code{bin_conditions}
+            ORDER BY s.total_amount DESC, s.item_code, b.warehouse
+            """,
+            params,
+            as_dict=True,
+        )
+
+    rows = []
+    item_rows = {}
+
+    for d in sales_rows:
+        r = item_rows.get(d.item_code)
+
+        if r is None:
+            r = item_rows[d.item_code] = frappe._dict(
+                item_code=d.item_code,
+                item_name=d.item_name,
+                item_group=d.item_group,
+                total_amount=d.total_amount,
+                total_qty=d.total_qty,
+                min_stock_level=d.min_stock_level,
+                total_stock_qty=0,
+                # drill down payload: [[warehouse, qty], ...]
+                warehouses=[],
+            )
+            rows.append(r)
+
+        if d.warehouse:
+            r.total_stock_qty += d.stock_qty or 0
+            r.warehouses.append([d.warehouse, d.stock_qty or 0])
 
     # --------------------------------------
     # FINAL MERGE
     # --------------------------------------
     for r in rows:
-        item_code = r.item_code
-
-        # total stock qty
-        r["total_stock_qty"] = total_stock.get(item_code, 0)
+        # ensure WIP warehouse exists even if qty = 0
+        if not any(w == WIP_WAREHOUSE for w, _qty in r.warehouses):
+            r.warehouses.append([WIP_WAREHOUSE, 0])
 
         # MSL = safety_stock
         msl = r.get("min_stock_level") or 0
@@ -132,4 +226,76 @@ def get_data(filters):
         # drill down
         r["details"] = "View Warehouses"
 
+        # keyset position of this row, exact (not a float) for the next page
+        r["cursor"] = [str(r.total_amount), r.item_code]
+
     return rows
+
+
+def get_item_totals(filters, sales_query, params):
+    """
+    Ranked per-item totals of the year for this filter set. Kept next to the
+    report's cached results (so sales / item changes drop them too) and shared
+    by every "Load More" page.
+    """
+    clear_if_stale(REPORT_NAME)
+    key = get_cache_key(REPORT_NAME, dict(filters, top_n=None, item_totals=1))
+
+    totals = frappe.cache.get_value(key)
+    if totals is None:
+        totals = frappe.db.sql(sales_query, params, as_dict=True)
+        frappe.cache.set_value(key, totals, expires_in_sec=DEFAULT_TTL)
+
+    touch(REPORT_NAME, key)
+    evict(REPORT_NAME)
+
+    return totals
+
+
+def get_page_after(totals, cursor, top_n):
+    """The `top_n` totals following the cursor row."""
+    after_amount, after_item = Decimal(cursor[0]), cursor[1]
+
+    start = next((i + 1 for i, d in enumerate(totals) if d.item_code == after_item), None)
+    if start is None:
+        # the cursor item dropped out of the ranking: resume below its amount
+        start = next((i for i, d in enumerate(totals) if d.total_amount < after_amount), len(totals))
+
+    return totals[start : start + top_n]
+
+
+def get_page_stock(page, stock_field, bin_conditions, params):
+    """One row per (item, warehouse) of `page`, shaped like the first page query."""
+    if not page:
+        return []
+
+    bins = {}
+    for b in frappe.db.sql(
+        f"""
+        SELECT b.item_code, b.warehouse, b.{stock_field} AS stock_qty
+        FROM `tabBin` b
+        WHERE b.item_code IN %(item_codes)s{bin_conditions}
+        ORDER BY b.item_code, b.warehouse
+        """,
+        dict(params, item_codes=[d.item_code for d in page]),
+        as_dict=True,
+    ):
+        bins.setdefault(b.item_code, []).append(b)
+
+    rows = []
+    for d in page:
+        for b in bins.get(d.item_code) or [frappe._dict(warehouse=None, stock_qty=None)]:
+            rows.append(frappe._dict(d, warehouse=b.warehouse, stock_qty=b.stock_qty))
+
+    return rows
+
+
+@frappe.whitelist()
+def get_next_page(filters, cursor):
+    """Rows following `cursor` (the last loaded row's cursor) for "Load More"."""
+    frappe.has_permission("Sales Invoice", throw=True)
+
+    filters = frappe._dict(frappe.parse_json(filters) or {})
+    set_date_range(filters)
+
+    return get_data(filters, frappe.parse_json(cursor))